@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Category, Comment, Location, Post
+from .models import Category, Comment, ImageTask, Location, Post
 
 
 @admin.register(Category)
@@ -55,3 +55,12 @@ class CommentAdmin(admin.ModelAdmin):
     def short_text(self, obj):
         return obj.text[:50] + '...' if len(obj.text) > 50 else obj.text
     short_text.short_description = 'Краткий текст'
+
+
+@admin.register(ImageTask)
+class ImageTaskAdmin(admin.ModelAdmin):
+    list_display = ('image', 'post', 'status', 'attempts', 'created_at')
+    list_filter = ('status',)
+    list_select_related = ('post',)
+    raw_id_fields = ('post',)
+    readonly_fields = ('created_at', 'locked_at', 'error')
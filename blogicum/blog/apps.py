@@ -5,3 +5,11 @@ class BlogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'blog'
     verbose_name = 'Блог'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from blog import signals  # noqa: F401
+        from blog.db import configure_sqlite_connection
+
+        connection_created.connect(configure_sqlite_connection)
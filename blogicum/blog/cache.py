@@ -0,0 +1,195 @@
+import time
+from functools import wraps
+from hashlib import md5
+
+from django.core.cache import cache, caches
+from django.middleware.csrf import get_token
+from django.utils import timezone
+
+from blog.constants import FEED_COUNT_TIMEOUT, PAGE_CACHE_TIMEOUT
+from blog.metrics import CACHE_REQUESTS
+from blog.models import Post
+
+PAGE_CACHE_PARAMS = ('page', 'after', 'before')
+GLOBAL_SCOPE = 'all'
+
+
+def _version_key(scope):
+    return f'blog:page-version:{scope}'
+
+
+def _versions_cache():
+    """Кэш версий: общий для процессов и без вытеснения страницами."""
+    return caches['versions']
+
+
+def get_scope_versions(*scopes):
+    """Возвращает версии областей кэша, заводя недостающие."""
+    versions_cache = _versions_cache()
+    keys = {scope: _version_key(scope) for scope in scopes}
+    versions = versions_cache.get_many(keys.values())
+    result = []
+    for scope, key in keys.items():
+        if key not in versions:
+            # Новая версия всегда больше потерянной, например, при
+            # перезапуске Redis.
+            versions[key] = time.time_ns()
+            versions_cache.add(key, versions[key], None)
+            versions[key] = versions_cache.get(key, versions[key])
+        result.append(versions[key])
+    return result
+
+
+def invalidate_scopes(*scopes):
+    """Сбрасывает закэшированные страницы указанных областей."""
+    versions_cache = _versions_cache()
+    for scope in set(scopes):
+        try:
+            versions_cache.incr(_version_key(scope))
+        except ValueError:
+            versions_cache.set(_version_key(scope), time.time_ns(), None)
+
+
+def get_post_scopes(post_id):
+    """Области кэша страниц, на которых показывается пост."""
+    keys = Post.objects.filter(pk=post_id).values_list(
+        'category__slug', 'author__username'
+    ).first()
+    if keys is None:
+        return ['index']
+    category_slug, username = keys
+    return ['index', f'category:{category_slug}', f'profile:{username}']
+
+
+def _get_page_params(request):
+    return '&'.join(
+        f'{name}={request.GET[name]}'
+        for name in PAGE_CACHE_PARAMS if name in request.GET
+    )
+
+
+def _make_etag(*parts):
+    return md5(
+        '|'.join(map(str, parts)).encode(), usedforsecurity=False
+    ).hexdigest()
+
+
+def get_page_cache_key(request, scope):
+    params = _get_page_params(request)
+    versions = '.'.join(map(str, get_scope_versions(GLOBAL_SCOPE, scope)))
+    path = md5(
+        f'{request.path}?{params}'.encode(), usedforsecurity=False
+    ).hexdigest()
+    return f'blog:page:{scope}:{versions}:{path}'
+
+
+def get_page_cache_timeout():
+    """Не держит страницу дольше, чем до выхода отложенного поста."""
+    now = timezone.now()
+    next_pub_date = Post.objects.filter(
+        is_published=True, pub_date__gt=now
+    ).order_by('pub_date').values_list('pub_date', flat=True).first()
+    if next_pub_date is None:
+        return PAGE_CACHE_TIMEOUT
+    return min(
+        PAGE_CACHE_TIMEOUT,
+        int((next_pub_date - now).total_seconds()) + 1
+    )
+
+
+def get_feed_count_key(scope, variant='published'):
+    """Ключ числа постов ленты; сбрасывается вместе с count:<scope>."""
+    versions = '.'.join(
+        map(str, get_scope_versions(GLOBAL_SCOPE, f'count:{scope}'))
+    )
+    return f'blog:feed-count:{scope}:{variant}:{versions}'
+
+
+def get_feed_count_timeout():
+    return min(FEED_COUNT_TIMEOUT, get_page_cache_timeout())
+
+
+def feed_etag(scope):
+    """Возвращает ETag ленты по версиям её областей кэша.
+
+    Учитывается и дата последнего вышедшего поста: отложенные
+    публикации появляются в лентах без сигналов.
+    """
+
+    def etag_func(request, *args, **kwargs):
+        latest_pub_date = Post.objects.filter(
+            is_published=True, pub_date__lte=timezone.now()
+        ).order_by('-pub_date').values_list('pub_date', flat=True).first()
+        return _make_etag(
+            *get_scope_versions(GLOBAL_SCOPE, scope.format(**kwargs)),
+            latest_pub_date,
+            request.user.pk,
+            _get_page_params(request),
+        )
+
+    return etag_func
+
+
+def _csrf_secret(request):
+    """Секрет CSRF без маски: get_token каждый раз маскирует его заново."""
+    get_token(request)
+    return request.META['CSRF_COOKIE']
+
+
+def post_detail_etag(request, post_id, **kwargs):
+    """Возвращает ETag поста по updated_at его самого и связей.
+
+    Правки комментариев учитываются через версию области post:<id>,
+    порция комментариев — через ?after=. Пользователю страница отдаёт
+    форму комментария с csrf_token, поэтому в ETag входит секрет CSRF:
+    после повторного входа браузер не оставит в форме старый токен.
+    """
+    state = Post.objects.visible_to(request.user).filter(pk=post_id).values(
+        'updated_at', 'comment_count', 'author__username',
+        'category__updated_at', 'location__updated_at'
+    ).first()
+    if state is None:
+        return None
+    return _make_etag(
+        *state.values(),
+        *get_scope_versions(GLOBAL_SCOPE, f'post:{post_id}'),
+        request.user.pk,
+        _get_page_params(request),
+        _csrf_secret(request) if request.user.is_authenticated else None,
+    )
+
+
+def anonymous_page_cache(scope):
+    """Кэширует GET-ответы анонимным пользователям.
+
+    `scope` — строка формата по аргументам URL, например
+    'category:{category_slug}'; её версия сбрасывается сигналами.
+    """
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET' or request.user.is_authenticated:
+                return view_func(request, *args, **kwargs)
+            cache_key = get_page_cache_key(request, scope.format(**kwargs))
+            response = cache.get(cache_key)
+            if response is not None:
+                CACHE_REQUESTS.inc(cache='page', result='hit')
+                return response
+            CACHE_REQUESTS.inc(cache='page', result='miss')
+            response = view_func(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+
+            def store(response):
+                cache.set(cache_key, response, get_page_cache_timeout())
+
+            if hasattr(response, 'render') and callable(response.render):
+                response.add_post_render_callback(store)
+            else:
+                store(response)
+            return response
+
+        return wrapper
+
+    return decorator
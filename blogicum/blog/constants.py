@@ -1,3 +1,30 @@
 POSTS_PER_PAGE = 5
 TITLE_TRUNCATE_LIMIT = 30
 PAGINATE_BY = 10
+PAGE_CACHE_TIMEOUT = 60 * 15
+COMMENTS_PER_PAGE = 20
+FEED_COUNT_TIMEOUT = 60 * 5
+FEED_COUNT_LIMIT = 10000
+FEED_COUNT_SAMPLE = 1000
+PAGE_RANGE_ON_EACH_SIDE = 2
+PAGE_RANGE_ON_ENDS = 1
+# Дальше этой страницы лента открывается только по курсору: OFFSET
+# растёт с номером страницы, а краулеры обходят все ссылки ?page=.
+MAX_OFFSET_PAGE = 20
+# Уменьшенные копии Post.image: карточка в ленте, страница поста и
+# карточка на экранах с двойной плотностью пикселей.
+IMAGE_RENDITION_WIDTHS = {'card': 640, 'detail': 960, 'retina': 1280}
+IMAGE_RENDITION_QUALITY = 85
+# Карточка поста — 40rem, на узких экранах — вся ширина.
+IMAGE_SIZES = '(max-width: 40rem) 100vw, 40rem'
+# Размытое превью (LQIP), которое видно, пока грузится изображение:
+# по длинной стороне не больше IMAGE_LQIP_SIZE пикселей.
+IMAGE_LQIP_SIZE = 16
+IMAGE_LQIP_QUALITY = 40
+# Больше пикселей Pillow не декодирует: защита от «бомб» декомпрессии.
+IMAGE_MAX_PIXELS = 40_000_000
+IMAGE_TASK_MAX_ATTEMPTS = 3
+# Файл с именем из хэша содержимого не меняется: кэшируется на год.
+MEDIA_IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+# Задача, взятая в работу раньше, считается брошенной упавшим обработчиком.
+IMAGE_TASK_LOCK_TIMEOUT = 60 * 10
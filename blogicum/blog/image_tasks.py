@@ -0,0 +1,125 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from blog.cache import get_post_scopes, invalidate_scopes
+from blog.constants import IMAGE_TASK_LOCK_TIMEOUT, IMAGE_TASK_MAX_ATTEMPTS
+from blog.images import read_dimensions
+from blog.models import ImageTask, Post
+from blog.storage import post_image_storage
+
+PENDING_META = {'status': 'pending'}
+FAILED_META = {'status': 'failed'}
+
+
+def _set_image_meta(post_id, image, meta, new_image=None):
+    """Обновляет image_meta, если у публикации всё ещё тот же файл.
+
+    new_image — новое имя оригинала, если обработка его заменила.
+    """
+    fields = {'image_meta': meta, 'updated_at': timezone.now()}
+    if new_image:
+        fields['image'] = new_image
+    updated = Post.objects.filter(pk=post_id, image=image).update(**fields)
+    if updated:
+        invalidate_scopes(f'post:{post_id}', *get_post_scopes(post_id))
+    return updated
+
+
+def _discard_original(name):
+    """Удаляет оригинал с EXIF, если на него больше никто не ссылается.
+
+    Иначе файл с GPS-координатами отдавался бы по immutable-URL до
+    запуска delete_orphaned_media. Удаление — после коммита, чтобы при
+    откате публикация не осталась без файла.
+    """
+    if (Post.objects.filter(image=name).exists()
+            or ImageTask.objects.filter(image=name).exists()):
+        return
+    transaction.on_commit(lambda: post_image_storage.delete(name))
+
+
+def enqueue_post_image(post):
+    """Ставит изображение публикации в очередь process_image_tasks.
+
+    До окончания обработки шаблоны показывают заглушку. Размеры
+    читаются из заголовка файла сразу, чтобы заглушка занимала
+    место будущего изображения.
+    """
+    ImageTask.objects.filter(post_id=post.pk).delete()
+    meta = {}
+    shared_meta = None
+    if post.image:
+        # Тот же файл у другой публикации уже обработан: копии общие.
+        shared_meta = Post.objects.filter(
+            image=post.image.name, image_meta__has_key='lqip'
+        ).exclude(pk=post.pk).values_list('image_meta', flat=True).first()
+    if shared_meta:
+        meta = shared_meta
+    elif post.image:
+        ImageTask.objects.create(post_id=post.pk, image=post.image.name)
+        meta = dict(PENDING_META)
+        dimensions = read_dimensions(post.image.name, post.image.storage)
+        if dimensions:
+            meta['width'], meta['height'] = dimensions
+    post.image_meta = meta
+    post.updated_at = timezone.now()
+    Post.objects.filter(pk=post.pk).update(
+        image_meta=meta, updated_at=post.updated_at
+    )
+
+
+def claim_image_tasks(limit):
+    """Забирает до limit задач; одну задачу получает один обработчик."""
+    now = timezone.now()
+    ImageTask.objects.filter(
+        status=ImageTask.Status.PROCESSING,
+        locked_at__lt=now - timedelta(seconds=IMAGE_TASK_LOCK_TIMEOUT),
+    ).update(status=ImageTask.Status.PENDING)
+    claimed = []
+    candidates = ImageTask.objects.filter(
+        status=ImageTask.Status.PENDING
+    ).order_by('pk')[:limit]
+    for task in candidates:
+        taken = ImageTask.objects.filter(
+            pk=task.pk, status=ImageTask.Status.PENDING
+        ).update(
+            status=ImageTask.Status.PROCESSING,
+            locked_at=now,
+            attempts=F('attempts') + 1,
+        )
+        if taken:
+            task.attempts += 1
+            claimed.append(task)
+    return claimed
+
+
+def complete_image_task(task, meta):
+    """Сохраняет результат process_image.
+
+    Если оригинал сохранён заново без EXIF, публикация переходит на
+    новое имя, а старый файл сразу удаляется, если он больше ничей.
+    """
+    meta = dict(meta)
+    new_image = meta.pop('name', None)
+    with transaction.atomic():
+        updated = _set_image_meta(task.post_id, task.image, meta, new_image)
+        ImageTask.objects.filter(pk=task.pk).delete()
+        if updated and new_image and new_image != task.image:
+            _discard_original(task.image)
+
+
+def fail_image_task(task, error, permanent=False):
+    """Возвращает задачу в очередь или, если попытки кончились, бросает."""
+    if not permanent and task.attempts < IMAGE_TASK_MAX_ATTEMPTS:
+        ImageTask.objects.filter(pk=task.pk).update(
+            status=ImageTask.Status.PENDING, error=str(error)
+        )
+        return
+    with transaction.atomic():
+        ImageTask.objects.filter(pk=task.pk).update(
+            status=ImageTask.Status.FAILED, error=str(error)
+        )
+        _set_image_meta(task.post_id, task.image, FAILED_META)
@@ -0,0 +1,239 @@
+import base64
+import re
+import warnings
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import ExifTags, Image, ImageOps
+
+from blog.constants import (
+    IMAGE_LQIP_QUALITY,
+    IMAGE_LQIP_SIZE,
+    IMAGE_MAX_PIXELS,
+    IMAGE_RENDITION_QUALITY,
+    IMAGE_RENDITION_WIDTHS,
+)
+from blog.storage import is_hashed_name, post_image_storage
+
+RENDITION_RE = re.compile(r'^(?P<stem>.+)\.w(?P<width>\d+)(?P<suffix>\.\w+)$')
+# Форматы, у которых есть смысл делать WebP-копии; GIF может быть анимацией.
+WEBP_SOURCES = {'JPEG', 'PNG'}
+WEBP_ORIGINAL_SUFFIXES = ('.jpg', '.jpeg', '.png', '.JPG', '.JPEG', '.PNG')
+SAVE_OPTIONS = {
+    'JPEG': {'quality': IMAGE_RENDITION_QUALITY, 'optimize': True,
+             'progressive': True},
+    'PNG': {'optimize': True},
+    'WEBP': {'quality': IMAGE_RENDITION_QUALITY, 'method': 4},
+}
+# Значения EXIF Orientation, при которых ширина и высота меняются местами.
+TRANSPOSED_ORIENTATIONS = {5, 6, 7, 8}
+# Оригинал перезаписывается только ради удаления EXIF, почти без потерь.
+ORIGINAL_OPTIONS = {'JPEG': {'quality': 95}}
+
+
+class ImageProcessingError(Exception):
+    """Изображение нельзя обработать: повреждено или слишком велико."""
+
+
+def rendition_name(name, width, suffix=None):
+    """posts/photo.jpg -> posts/photo.w640.jpg или posts/photo.w640.webp"""
+    path = PurePosixPath(name)
+    return str(path.with_name(
+        f'{path.stem}.w{width}{suffix or path.suffix}'
+    ))
+
+
+def original_candidates(name):
+    """Имена, ссылка на которые делает файл name нужным.
+
+    Сам файл и, если это копия, её оригинал того же формата; WebP-копия
+    может быть сделана и с JPEG или PNG, поэтому для неё перебираются
+    ещё форматы из WEBP_ORIGINAL_SUFFIXES.
+    """
+    candidates = {name}
+    match = RENDITION_RE.match(name)
+    if match:
+        stem, suffix = match['stem'], match['suffix']
+        candidates.add(f'{stem}{suffix}')
+        if suffix == '.webp':
+            candidates.update(
+                f'{stem}{original}' for original in WEBP_ORIGINAL_SUFFIXES
+            )
+    return candidates
+
+
+def rendition_widths(image_width):
+    """Ширины уменьшенных копий; увеличенных копий не бывает."""
+    return sorted(
+        width for width in set(IMAGE_RENDITION_WIDTHS.values())
+        if width < image_width
+    )
+
+
+def build_srcset(name, image_width, storage=default_storage):
+    candidates = [
+        f'{storage.url(rendition_name(name, width))} {width}w'
+        for width in rendition_widths(image_width)
+    ]
+    candidates.append(f'{storage.url(name)} {image_width}w')
+    return ', '.join(candidates)
+
+
+def build_webp_srcset(name, image_width, storage=default_storage):
+    """Атрибут srcset WebP-копий: уменьшенные и копия в полный размер."""
+    return ', '.join(
+        f'{storage.url(rendition_name(name, width, ".webp"))} {width}w'
+        for width in [*rendition_widths(image_width), image_width]
+    )
+
+
+def fallback_url(name, image_width, kind, storage=default_storage):
+    """URL копии kind или оригинала, если он не шире её."""
+    width = IMAGE_RENDITION_WIDTHS[kind]
+    if width < image_width:
+        return storage.url(rendition_name(name, width))
+    return storage.url(name)
+
+
+def _encode(image, image_format, **options):
+    buffer = BytesIO()
+    image.save(
+        buffer, image_format,
+        **{**SAVE_OPTIONS.get(image_format, {}), **options}
+    )
+    return ContentFile(buffer.getvalue())
+
+
+def _save(image, name, image_format, storage, **options):
+    if storage.exists(name):
+        # Копии оригинала с именем из хэша отдаются как immutable:
+        # готовая копия не перезаписывается.
+        if is_hashed_name(name):
+            return
+        storage.delete(name)
+    storage.save(name, _encode(image, image_format, **options))
+
+
+def _open(fp):
+    """Открывает изображение, отказываясь от «бомб» до декодирования."""
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', Image.DecompressionBombWarning)
+        try:
+            image = Image.open(fp)
+        except (Image.DecompressionBombError,
+                Image.DecompressionBombWarning) as error:
+            raise ImageProcessingError(str(error)) from error
+        except OSError as error:
+            raise ImageProcessingError(
+                f'Не удалось прочитать изображение: {error}'
+            ) from error
+    width, height = image.size
+    if width * height > IMAGE_MAX_PIXELS:
+        image.close()
+        raise ImageProcessingError(
+            f'Изображение {width}x{height} больше {IMAGE_MAX_PIXELS} пикселей.'
+        )
+    return image
+
+
+def read_dimensions(name, storage=default_storage):
+    """Ширина и высота с учётом EXIF по заголовку файла, без декодирования.
+
+    Возвращает None, если файл не читается как изображение.
+    """
+    try:
+        with storage.open(name, 'rb') as fp, _open(fp) as image:
+            width, height = image.size
+            orientation = image.getexif().get(ExifTags.Base.Orientation)
+    except (ImageProcessingError, OSError):
+        return None
+    if orientation in TRANSPOSED_ORIENTATIONS:
+        width, height = height, width
+    return width, height
+
+
+def dominant_color(image):
+    """Самый частый из восьми цветов уменьшенного изображения, #rrggbb."""
+    small = image.convert('RGB')
+    small.thumbnail((64, 64))
+    quantized = small.quantize(colors=8)
+    _, index = max(quantized.getcolors())
+    red, green, blue = quantized.getpalette()[index * 3:index * 3 + 3]
+    return f'#{red:02x}{green:02x}{blue:02x}'
+
+
+def build_lqip(image):
+    """Крошечное JPEG-превью как data URI для фона до загрузки."""
+    small = image.convert('RGB')
+    small.thumbnail((IMAGE_LQIP_SIZE, IMAGE_LQIP_SIZE))
+    buffer = BytesIO()
+    small.save(buffer, 'JPEG', quality=IMAGE_LQIP_QUALITY)
+    encoded = base64.b64encode(buffer.getvalue()).decode('ascii')
+    return f'data:image/jpeg;base64,{encoded}'
+
+
+def process_image(name, storage=default_storage,
+                  original_storage=post_image_storage):
+    """Готовит изображение публикации к показу.
+
+    Оригинал с EXIF поворачивается и сохраняется без EXIF как новый
+    файл original_storage — под именем из хэша нового содержимого;
+    прежний файл не перезаписывается, его удаляет complete_image_task.
+    Рядом сохраняются уменьшенные копии в исходном формате и в WebP.
+    Возвращает сведения для Post.image_meta: размеры, основной цвет
+    и LQIP-превью, а если оригинал сменился — его имя под ключом
+    'name'. Выполняется в процессе из пула process_image_tasks и не
+    обращается к базе.
+    """
+    with storage.open(name, 'rb') as fp, _open(fp) as original:
+        image_format = original.format
+        try:
+            image = ImageOps.exif_transpose(original)
+            image.load()
+        except (OSError, ValueError, SyntaxError) as error:
+            raise ImageProcessingError(
+                f'Не удалось декодировать изображение: {error}'
+            ) from error
+        has_exif = bool(original.getexif())
+        # Цветовой профиль не личные данные: без него съедут цвета.
+        options = {'icc_profile': original.info.get('icc_profile')}
+    if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    width, height = image.size
+    meta = {}
+    if has_exif and image_format in SAVE_OPTIONS:
+        name = meta['name'] = original_storage.save(name, _encode(
+            image, image_format,
+            **options, **ORIGINAL_OPTIONS.get(image_format, {})
+        ))
+
+    webp = image_format in WEBP_SOURCES
+    for target in rendition_widths(width):
+        resized = image.resize(
+            (target, max(1, round(height * target / width))),
+            Image.Resampling.LANCZOS,
+        )
+        _save(
+            resized, rendition_name(name, target), image_format, storage,
+            **options
+        )
+        if webp:
+            _save(
+                resized, rendition_name(name, target, '.webp'), 'WEBP',
+                storage, **options
+            )
+    if webp:
+        _save(
+            image, rendition_name(name, width, '.webp'), 'WEBP', storage,
+            **options
+        )
+    return {
+        **meta,
+        'width': width,
+        'height': height,
+        'webp': webp,
+        'color': dominant_color(image),
+        'lqip': build_lqip(image),
+    }
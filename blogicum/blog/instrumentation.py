@@ -0,0 +1,94 @@
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.db import connections
+from django.template.backends.django import DjangoTemplates, Template
+
+from blog.slow_queries import is_explaining, log_slow_query
+
+_current_stats = ContextVar('blog_request_stats', default=None)
+
+
+class RequestStats:
+    """Счётчики одного запроса: SQL и отрисовка шаблонов."""
+
+    __slots__ = (
+        'request', 'queries', 'sql_time', 'template_time', '_rendering'
+    )
+
+    def __init__(self, request=None):
+        self.request = request
+        self.queries = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+        self._rendering = False
+
+
+def get_request_stats():
+    """Счётчики текущего запроса или None вне collect_request_stats."""
+    return _current_stats.get()
+
+
+def _record_query(execute, sql, params, many, context):
+    stats = _current_stats.get()
+    if stats is None or is_explaining():
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        result = execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - started
+        stats.sql_time += duration
+        stats.queries += 1
+    log_slow_query(
+        context['connection'], sql, params, many, duration,
+        get_view_name(stats.request)
+    )
+    return result
+
+
+def get_view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match is not None else 'unresolved'
+
+
+@contextmanager
+def collect_request_stats(request=None):
+    """Собирает RequestStats для кода внутри блока."""
+    stats = RequestStats(request)
+    token = _current_stats.set(stats)
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(_record_query))
+            yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+class TimedTemplate(Template):
+
+    def render(self, context=None, request=None):
+        stats = _current_stats.get()
+        # Вложенные отрисовки (render_to_string в тегах) уже учтены внешней.
+        if stats is None or stats._rendering:
+            return super().render(context, request)
+        stats._rendering = True
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            stats.template_time += time.perf_counter() - started
+            stats._rendering = False
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """Шаблонизатор Django, замеряющий время отрисовки для RequestStats."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return TimedTemplate(template.template, self)
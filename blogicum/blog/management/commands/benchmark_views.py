@@ -0,0 +1,329 @@
+import json
+import logging
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.urls import resolve, reverse
+
+from blog import urls as blog_urls
+from blog.models import Comment, Post
+
+# Представления, которые открываются от имени автора комментария.
+COMMENTER_VIEWS = {'edit_comment', 'delete_comment'}
+# Публичные страницы дополнительно замеряются для анонима.
+ANONYMOUS_VIEWS = {
+    'index', 'post_detail', 'category_posts', 'profile', 'search',
+    'post_comments',
+}
+# Сравниваемые с базовой линией метрики: ключ результата и подпись.
+LATENCY_METRICS = (('p95_ms', 'p95'), ('cold_p95_ms', 'p95 без кэша'))
+QUERY_METRICS = (
+    ('queries', 'запросов'), ('cold_queries', 'запросов без кэша'),
+)
+# Представления, которые принимают только POST: GET для них не замеряется.
+POST_ONLY_VIEWS = {'add_comment'}
+# POST-сценарии: данные формы по посту и комментарию. Каждый запрос
+# выполняется в откатываемой транзакции, поэтому база не меняется.
+# Регистрация и смена пароля не замеряются: в них доминирует хэширование
+# пароля, а смена пароля ещё и сбрасывает сессию клиента.
+POST_DATA = {
+    'add_comment': lambda post, comment: {'text': 'Комментарий'},
+    'edit_comment': lambda post, comment: {'text': 'Комментарий'},
+    'delete_comment': lambda post, comment: {},
+    'create_post': lambda post, comment: post_form_data(post),
+    'edit_post': lambda post, comment: post_form_data(post),
+    'delete_post': lambda post, comment: {},
+}
+
+
+def post_form_data(post):
+    return {
+        'title': post.title,
+        'text': post.text,
+        'pub_date': post.pub_date.strftime('%Y-%m-%dT%H:%M'),
+        'location': post.location_id or '',
+        'category': post.category_id,
+        'is_published': 'on',
+    }
+
+
+def view_of(callback):
+    return getattr(callback, 'view_class', callback)
+
+
+def is_success(status):
+    return 200 <= status < 400
+
+
+def percentile(values, share):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * share))]
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет p50/p95 задержки, число SQL-запросов и пик памяти для '
+        'каждого маршрута blog/urls.py на заполненной базе '
+        '(см. generate_data) и сравнивает с базовой линией.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--baseline', default='view_benchmarks.json',
+            help='JSON-файл базовой линии.'
+        )
+        parser.add_argument(
+            '--update-baseline', action='store_true',
+            help='Записать результаты прогона в файл базовой линии.'
+        )
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument(
+            '--latency-tolerance', type=float, default=0.25,
+            help='Допустимый относительный рост p95, 0.25 — на 25%%.'
+        )
+        parser.add_argument(
+            '--latency-floor', type=float, default=5.0,
+            help='Рост p95 меньше этого числа миллисекунд не считается '
+                 'регрессией.'
+        )
+        parser.add_argument(
+            '--queries-tolerance', type=int, default=0,
+            help='На сколько запросов может вырасти их число.'
+        )
+        parser.add_argument(
+            '--memory-tolerance', type=float, default=0.25,
+            help='Допустимый относительный рост пика памяти.'
+        )
+
+    def handle(self, *args, **options):
+        scenarios = self.build_scenarios()
+        results = {}
+        # Ошибки маршрутов попадают в отчёт статусом, а не в журнал.
+        request_logger = logging.getLogger('django.request')
+        level = request_logger.level
+        request_logger.setLevel(logging.CRITICAL)
+        try:
+            for name, method, url, client, data in scenarios:
+                results[name] = self.measure(
+                    method, url, client, data, options['iterations']
+                )
+                self.report(name, results[name])
+        finally:
+            request_logger.setLevel(level)
+        failed = [
+            f'{name}: {result["method"]} {result["url"]} -> '
+            f'{result["status"]}'
+            for name, result in results.items()
+            if not is_success(result['status'])
+        ]
+        if failed:
+            raise CommandError(
+                'Маршруты ответили ошибкой:\n' + '\n'.join(failed)
+            )
+
+        baseline_path = Path(options['baseline'])
+        if options['update_baseline']:
+            baseline_path.write_text(
+                json.dumps(results, indent=2, ensure_ascii=False),
+                encoding='utf-8'
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f'Базовая линия записана в {baseline_path}'
+            ))
+            return
+        if not baseline_path.exists():
+            self.stdout.write(self.style.WARNING(
+                f'Нет базовой линии {baseline_path}, сравнение пропущено.'
+            ))
+            return
+        baseline = json.loads(baseline_path.read_text(encoding='utf-8'))
+        regressions = self.compare(baseline, results, options)
+        if regressions:
+            raise CommandError(
+                'Регрессии производительности:\n' + '\n'.join(regressions)
+            )
+        self.stdout.write(self.style.SUCCESS('Регрессий нет.'))
+
+    def build_scenarios(self):
+        comment = Comment.objects.filter(
+            post__in=Post.objects.published()
+        ).select_related('post__author', 'post__category', 'author').first()
+        if comment is None:
+            raise CommandError(
+                'В базе нет опубликованных постов с комментариями; '
+                'заполните её командой generate_data.'
+            )
+        post = comment.post
+        kwargs = {
+            'post_id': post.pk,
+            'comment_id': comment.pk,
+            'category_slug': post.category.slug,
+            'username': post.author.username,
+        }
+        clients = {
+            role: Client(raise_request_exception=False)
+            for role in ('author', 'commenter', 'anonymous')
+        }
+        clients['author'].force_login(post.author)
+        clients['commenter'].force_login(comment.author)
+
+        scenarios = []
+        for pattern in blog_urls.urlpatterns:
+            if not pattern.name:
+                continue
+            url = reverse(
+                f'{blog_urls.app_name}:{pattern.name}',
+                kwargs={
+                    key: kwargs[key] for key in pattern.pattern.converters
+                }
+            )
+            served_by = view_of(resolve(url).func)
+            if served_by is not view_of(pattern.callback):
+                self.stdout.write(self.style.WARNING(
+                    f'{pattern.name}: {url} обслуживает {served_by.__name__}, '
+                    'маршрут перекрыт и пропущен.'
+                ))
+                continue
+            if pattern.name == 'search':
+                url += f'?q={post.title.split()[0]}'
+            role = 'commenter' if pattern.name in COMMENTER_VIEWS else 'author'
+            client = clients[role]
+            if pattern.name not in POST_ONLY_VIEWS:
+                scenarios.append((pattern.name, 'get', url, client, None))
+            if pattern.name in POST_DATA:
+                data = POST_DATA[pattern.name](post, comment)
+                scenarios.append(
+                    (f'{pattern.name}[post]', 'post', url, client, data)
+                )
+            if pattern.name in ANONYMOUS_VIEWS:
+                scenarios.append((
+                    f'{pattern.name}[anon]', 'get', url,
+                    clients['anonymous'], None
+                ))
+        return scenarios
+
+    def send(self, method, url, client, data):
+        if method == 'get':
+            return client.get(url)
+        with transaction.atomic():
+            response = client.post(url, data)
+            transaction.set_rollback(True)
+        return response
+
+    def measure(self, method, url, client, data, iterations):
+        """Замеры с прогретым кэшем и с пустым.
+
+        Прогретый проход показывает попадания в кэш страниц и фрагментов,
+        холодный — полную отрисовку, регрессии которой кэш скрывает.
+        Пик памяти меряется на холодном проходе.
+        """
+        cache.clear()
+        response = self.send(method, url, client, data)
+        warm = self.time_requests(
+            method, url, client, data, iterations, cold=False
+        )
+        warm_queries = self.count_queries(method, url, client, data)
+        cold = self.time_requests(
+            method, url, client, data, iterations, cold=True
+        )
+        cold_queries = self.count_queries(
+            method, url, client, data, cold=True
+        )
+        cache.clear()
+        tracemalloc.start()
+        self.send(method, url, client, data)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return {
+            'method': method.upper(),
+            'url': url,
+            'status': response.status_code,
+            'p50_ms': statistics.median(warm),
+            'p95_ms': percentile(warm, 0.95),
+            'queries': warm_queries,
+            'cold_p50_ms': statistics.median(cold),
+            'cold_p95_ms': percentile(cold, 0.95),
+            'cold_queries': cold_queries,
+            'peak_kb': peak / 1024,
+        }
+
+    def time_requests(self, method, url, client, data, iterations, cold):
+        timings = []
+        for _ in range(iterations):
+            if cold:
+                cache.clear()
+            started = time.perf_counter()
+            self.send(method, url, client, data)
+            timings.append((time.perf_counter() - started) * 1000)
+        return timings
+
+    def count_queries(self, method, url, client, data, cold=False):
+        queries = []
+
+        def count_query(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        if cold:
+            cache.clear()
+        with connection.execute_wrapper(count_query):
+            self.send(method, url, client, data)
+        return len(queries)
+
+    def report(self, name, result):
+        self.stdout.write(
+            f'{name:<30} {result["status"]} '
+            f'p50={result["p50_ms"]:.1f}мс '
+            f'p95={result["p95_ms"]:.1f}мс '
+            f'запросов={result["queries"]} | без кэша: '
+            f'p50={result["cold_p50_ms"]:.1f}мс '
+            f'p95={result["cold_p95_ms"]:.1f}мс '
+            f'запросов={result["cold_queries"]} '
+            f'память={result["peak_kb"]:.0f}КБ'
+        )
+
+    def compare(self, baseline, results, options):
+        regressions = []
+        for name, before in baseline.items():
+            after = results.get(name)
+            if after is None:
+                continue
+            if after['status'] != before['status']:
+                regressions.append(
+                    f'{name}: статус {before["status"]} -> {after["status"]}'
+                )
+            regressions.extend(
+                f'{name}: {message}'
+                for message in self.compare_metrics(before, after, options)
+            )
+        return regressions
+
+    def compare_metrics(self, before, after, options):
+        # Базовые линии до появления холодного прохода не содержат
+        # его метрик: такие метрики не сравниваются.
+        for key, label in LATENCY_METRICS:
+            if key not in before:
+                continue
+            limit = max(
+                before[key] * (1 + options['latency_tolerance']),
+                before[key] + options['latency_floor'],
+            )
+            if after[key] > limit:
+                yield f'{label} {before[key]:.1f} -> {after[key]:.1f} мс'
+        for key, label in QUERY_METRICS:
+            if key not in before:
+                continue
+            if after[key] > before[key] + options['queries_tolerance']:
+                yield f'{label} {before[key]} -> {after[key]}'
+        limit = before['peak_kb'] * (1 + options['memory_tolerance'])
+        if after['peak_kb'] > limit:
+            yield (
+                f'память {before["peak_kb"]:.0f} -> '
+                f'{after["peak_kb"]:.0f} КБ'
+            )
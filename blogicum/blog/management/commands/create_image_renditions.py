@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from blog.image_tasks import enqueue_post_image
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Ставит в очередь обработки изображения уже существующих '
+        'публикаций; обрабатывает их process_image_tasks.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Поставить в очередь все изображения, в том числе уже '
+                 'обработанные и с ошибкой.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=500,
+            help='Сколько публикаций читать из базы за один запрос.'
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='').exclude(image__isnull=True)
+        if not options['force']:
+            # Обработанные до появления LQIP тоже ставятся в очередь.
+            posts = posts.exclude(image_meta__has_key='lqip').filter(
+                Q(image_meta__status__isnull=True)
+                | Q(image_meta__status='pending')
+            )
+        posts = posts.only('pk', 'image').order_by('pk')
+        last_pk = 0
+        queued = 0
+        while True:
+            chunk = list(posts.filter(pk__gt=last_pk)[:options['chunk_size']])
+            if not chunk:
+                break
+            for post in chunk:
+                enqueue_post_image(post)
+                queued += 1
+            last_pk = chunk[-1].pk
+        self.stdout.write(self.style.SUCCESS(
+            f'Поставлено в очередь изображений: {queued}'
+        ))
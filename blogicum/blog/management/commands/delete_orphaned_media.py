@@ -0,0 +1,118 @@
+import os
+import time
+from itertools import islice
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.images import original_candidates
+from blog.models import Post
+
+
+def iter_files(root):
+    """Файлы каталога и подкаталогов по одному.
+
+    os.scandir не читает каталог целиком, а в памяти хранится только
+    стек ещё не пройденных подкаталогов.
+    """
+    stack = [root]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except FileNotFoundError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield entry
+
+
+def iter_batches(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def find_orphans(batch, location, cutoff):
+    """Файлы пачки старше cutoff, которые не нужны ни одной публикации.
+
+    Одним запросом по индексу post_image_idx проверяются сами файлы
+    и оригиналы, от которых сделаны копии.
+    """
+    files = {
+        Path(entry.path).relative_to(location).as_posix(): entry
+        for entry in batch
+        if entry.stat().st_mtime < cutoff
+    }
+    if not files:
+        return []
+    candidates = set().union(*map(original_candidates, files))
+    referenced = set(
+        Post.objects.filter(image__in=candidates)
+        .values_list('image', flat=True)
+    )
+    return [
+        (name, entry) for name, entry in files.items()
+        if not original_candidates(name) & referenced
+    ]
+
+
+def delete_file(storage, name, path, cutoff):
+    try:
+        # Одинаковая загрузка могла только что освежить файл,
+        # см. HashedFileSystemStorage.save.
+        if os.stat(path).st_mtime >= cutoff:
+            return False
+        storage.delete(name)
+    except FileNotFoundError:
+        return False
+    return True
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет из MEDIA_ROOT изображения публикаций и их уменьшенные '
+        'копии, на которые не ссылается ни один пост.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать, что будет удалено.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Сколько файлов проверять одним запросом к базе.'
+        )
+        parser.add_argument(
+            '--min-age', type=float, default=24,
+            help='Не трогать файлы моложе стольких часов: их публикация '
+                 'может быть ещё не сохранена.'
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть больше нуля.')
+        field = Post._meta.get_field('image')
+        location = Path(field.storage.location)
+        root = location / field.upload_to.strip('/')
+        cutoff = time.time() - options['min_age'] * 3600
+        checked = deleted = freed = 0
+        for batch in iter_batches(iter_files(root), options['batch_size']):
+            checked += len(batch)
+            for name, entry in find_orphans(batch, location, cutoff):
+                size = entry.stat().st_size
+                if options['verbosity'] >= 2:
+                    self.stdout.write(name)
+                if options['dry_run'] or delete_file(
+                    field.storage, name, entry.path, cutoff
+                ):
+                    deleted += 1
+                    freed += size
+        action = 'Будет удалено' if options['dry_run'] else 'Удалено'
+        self.stdout.write(self.style.SUCCESS(
+            f'Проверено файлов: {checked}. {action}: {deleted}, '
+            f'{freed / 1024 / 1024:.1f} МБ.'
+        ))
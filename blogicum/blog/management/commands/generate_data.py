@@ -0,0 +1,263 @@
+import random
+import time
+from array import array
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from faker import Faker
+
+from blog.cache import GLOBAL_SCOPE, invalidate_scopes
+from blog.models import Category, Comment, ImageTask, Location, Post
+from blog.services import rebuild_comment_counts
+
+User = get_user_model()
+
+TEXT_POOL_SIZE = 2000
+FUTURE_SHARE = 0.05
+UNPUBLISHED_SHARE = 0.05
+UNPUBLISHED_CATEGORY_SHARE = 0.1
+# Даты отсчитываются от фиксированного момента, а не от текущего времени,
+# чтобы прогоны с одним seed совпадали в любой день.
+DEFAULT_EPOCH = '2024-01-01T00:00:00+00:00'
+# Отложенные посты сдвинуты на век вперёд и остаются в будущем при любом
+# прошлом --epoch.
+FUTURE_OFFSET = timedelta(days=100 * 365)
+COMMENT_WINDOW = 30 * 24 * 3600
+# Префикс имён, по которому находятся данные прошлого прогона.
+PREFIX = 'gen-'
+
+
+@contextmanager
+def explicit_dates(model, *names):
+    """Даёт bulk_create сохранить заданные даты полей auto_now_add."""
+    fields = [model._meta.get_field(name) for name in names]
+    saved = [field.auto_now_add for field in fields]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now_add in zip(fields, saved):
+            field.auto_now_add = auto_now_add
+
+
+class Command(BaseCommand):
+    help = (
+        'Генерирует детерминированный по --seed набор данных для нагрузочного '
+        'тестирования: python manage.py generate_data --users 100000 '
+        '--posts 5000000 --comments 50000000'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--locations', type=int, default=100)
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--posts', type=int, default=1000)
+        parser.add_argument('--comments', type=int, default=5000)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--epoch', default=DEFAULT_EPOCH,
+            help='Момент, от которого отсчитываются даты постов.'
+        )
+        parser.add_argument(
+            '--clear', action='store_true',
+            help=f'Удалить данные прошлого прогона (имена с {PREFIX}).'
+        )
+        parser.add_argument(
+            '--skew', type=float, default=3.0,
+            help='Степень перекоса распределения авторов, категорий и '
+                 'комментариев; 1 — равномерно.'
+        )
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.faker = Faker('ru_RU')
+        self.faker.seed_instance(options['seed'])
+        self.batch_size = options['batch_size']
+        self.skew = options['skew']
+        self.epoch = parse_datetime(options['epoch'])
+        if self.epoch is None:
+            raise CommandError(
+                f'Некорректная дата --epoch: {options["epoch"]}'
+            )
+        if timezone.is_naive(self.epoch):
+            self.epoch = timezone.make_aware(self.epoch)
+        self.sentences = [
+            self.faker.sentence(nb_words=12) for _ in range(TEXT_POOL_SIZE)
+        ]
+        self.words = [self.faker.word() for _ in range(TEXT_POOL_SIZE)]
+
+        if options['posts'] and not (options['users']
+                                     and options['categories']):
+            raise CommandError('Для постов нужны пользователи и категории.')
+        if options['comments'] and not (options['posts']
+                                        and options['users']):
+            raise CommandError('Для комментариев нужны посты и пользователи.')
+
+        with transaction.atomic():
+            if options['clear']:
+                self.clear()
+            elif self.has_generated():
+                raise CommandError(
+                    'В базе уже есть данные прошлого прогона generate_data; '
+                    'добавьте --clear, чтобы заменить их.'
+                )
+            self.categories = self.generate(
+                Category, options['categories'], self.build_category
+            )
+            self.locations = self.generate(
+                Location, options['locations'], self.build_location
+            )
+            self.password = make_password('password')
+            self.users = self.generate(
+                User, options['users'], self.build_user
+            )
+            # Даты публикации в секундах, по индексу в self.posts: от них
+            # отсчитываются даты комментариев.
+            self.post_dates = array('d')
+            self.posts = self.generate(
+                Post, options['posts'], self.build_post
+            )
+            with explicit_dates(Comment, 'created_at'):
+                self.generate(
+                    Comment, options['comments'], self.build_comment
+                )
+            rebuild_comment_counts()
+        invalidate_scopes(GLOBAL_SCOPE)
+
+    def has_generated(self):
+        return (
+            User.objects.filter(username__startswith=PREFIX).exists()
+            or Category.objects.filter(slug__startswith=PREFIX).exists()
+        )
+
+    def clear(self):
+        """Удаляет данные прошлого прогона: сначала зависимые строки.
+
+        Комментарии, посты и пользователи удаляются пачками по pk без
+        сигналов: каскадное удаление загрузило бы в память все строки.
+        Счётчики комментариев пересчитываются после генерации, кэш
+        сбрасывается целиком.
+        """
+        by_generated_author = Q(author__username__startswith=PREFIX)
+        on_generated_post = Q(post__author__username__startswith=PREFIX)
+        for queryset in (
+            Comment.objects.filter(by_generated_author | on_generated_post),
+            ImageTask.objects.filter(on_generated_post),
+            Post.objects.filter(by_generated_author),
+            User.objects.filter(username__startswith=PREFIX),
+        ):
+            deleted = self.delete_in_batches(queryset)
+            self.stdout.write(
+                f'{queryset.model._meta.label}: удалено {deleted}'
+            )
+        Category.objects.filter(slug__startswith=PREFIX).delete()
+        Location.objects.filter(name__startswith=PREFIX).delete()
+
+    def delete_in_batches(self, queryset):
+        deleted = 0
+        last_pk = 0
+        while True:
+            pks = list(
+                queryset.filter(pk__gt=last_pk).order_by('pk')
+                .values_list('pk', flat=True)[:self.batch_size]
+            )
+            if not pks:
+                return deleted
+            last_pk = pks[-1]
+            batch = queryset.model._base_manager.filter(pk__in=pks)
+            deleted += batch._raw_delete(batch.db)
+
+    def pick_index(self, size):
+        """Выбирает индекс с перекосом в сторону начала списка."""
+        return int(size * self.rng.random() ** self.skew)
+
+    def pick(self, ids):
+        return ids[self.pick_index(len(ids))]
+
+    def text(self, sentences):
+        return ' '.join(
+            self.rng.choice(self.sentences) for _ in range(sentences)
+        )
+
+    def generate(self, model, count, build):
+        """Создаёт count объектов пачками и возвращает их id."""
+        started = time.monotonic()
+        ids = array('q')
+        for start in range(0, count, self.batch_size):
+            batch = [
+                build(index)
+                for index in range(start, min(start + self.batch_size, count))
+            ]
+            model.objects.bulk_create(batch, batch_size=self.batch_size)
+            ids.extend(obj.pk for obj in batch)
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f'{model._meta.label}: {count} объектов, '
+            f'{count / max(elapsed, 1e-9):.0f} строк/с'
+        )
+        return ids
+
+    def build_category(self, index):
+        return Category(
+            title=' '.join(self.rng.sample(self.words, 2)).capitalize(),
+            description=self.text(2),
+            slug=f'{PREFIX}category-{index}',
+            is_published=self.rng.random() >= UNPUBLISHED_CATEGORY_SHARE,
+        )
+
+    def build_location(self, index):
+        return Location(name=f'{PREFIX}{self.faker.city()} {index}')
+
+    def build_user(self, index):
+        return User(
+            username=f'{PREFIX}user{index}',
+            first_name=self.faker.first_name(),
+            last_name=self.faker.last_name(),
+            email=f'{PREFIX}user{index}@example.com',
+            password=self.password,
+        )
+
+    def build_post(self, index):
+        if self.rng.random() < FUTURE_SHARE:
+            pub_date = self.epoch + FUTURE_OFFSET + timedelta(
+                seconds=self.rng.randrange(30 * 24 * 3600)
+            )
+        else:
+            pub_date = self.epoch - timedelta(
+                seconds=self.rng.randrange(3 * 365 * 24 * 3600)
+            )
+        self.post_dates.append(pub_date.timestamp())
+        return Post(
+            title=self.rng.choice(self.sentences)[:256],
+            text=self.text(self.rng.randint(3, 20)),
+            pub_date=pub_date,
+            author_id=self.pick(self.users),
+            category_id=self.pick(self.categories),
+            location_id=(
+                self.rng.choice(self.locations)
+                if self.locations and self.rng.random() < 0.7 else None
+            ),
+            is_published=self.rng.random() >= UNPUBLISHED_SHARE,
+        )
+
+    def build_comment(self, index):
+        post = self.pick_index(len(self.posts))
+        created_at = datetime.fromtimestamp(
+            self.post_dates[post] + self.rng.randrange(COMMENT_WINDOW),
+            tz=dt_timezone.utc,
+        )
+        return Comment(
+            post_id=self.posts[post],
+            author_id=self.pick(self.users),
+            text=self.text(self.rng.randint(1, 3)),
+            created_at=created_at,
+        )
@@ -0,0 +1,181 @@
+import gzip
+import json
+import time
+from collections import Counter
+
+from django.apps import apps
+from django.core import serializers
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from blog.cache import GLOBAL_SCOPE, invalidate_scopes
+from blog.services import rebuild_comment_counts
+
+MODEL_ORDER = (
+    'blog.category',
+    'blog.location',
+    'auth.user',
+    'blog.post',
+    'blog.comment',
+)
+READ_CHUNK_SIZE = 64 * 1024
+
+
+def open_dump(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, encoding='utf-8')
+
+
+def iter_json_array(fp):
+    """По одному отдаёт объекты из JSON-массива, не читая файл целиком."""
+    decoder = json.JSONDecoder()
+    buffer = fp.read(READ_CHUNK_SIZE).lstrip()
+    if not buffer.startswith('['):
+        raise CommandError('Ожидался JSON-массив объектов.')
+    pos = 1
+    while True:
+        while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+            pos += 1
+        if pos == len(buffer):
+            buffer, pos = fp.read(READ_CHUNK_SIZE), 0
+            if not buffer:
+                raise CommandError('Неожиданный конец JSON-файла.')
+            continue
+        if buffer[pos] == ']':
+            return
+        try:
+            obj, pos = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            chunk = fp.read(READ_CHUNK_SIZE)
+            if not chunk:
+                raise CommandError('Некорректный JSON в файле выгрузки.')
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+        yield obj
+
+
+def iter_jsonl(fp):
+    for line in fp:
+        if line.strip():
+            yield json.loads(line)
+
+
+def iter_dump(path):
+    with open_dump(path) as fp:
+        first = fp.read(1)
+        while first and first.isspace():
+            first = fp.read(1)
+        fp.seek(0)
+        records = iter_json_array(fp) if first == '[' else iter_jsonl(fp)
+        yield from records
+
+
+def reset_sequences():
+    """Сдвигает последовательности после вставки с явными pk, как loaddata.
+
+    Иначе на PostgreSQL следующий create() получит уже занятый pk.
+    """
+    models = []
+    for label in MODEL_ORDER:
+        model = apps.get_model(label)
+        models.append(model)
+        models.extend(
+            field.remote_field.through
+            for field in model._meta.many_to_many
+        )
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    if statements:
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково загружает выгрузку Django (JSON или JSONL, можно .gz) '
+        'пакетами bulk_create с сохранением первичных ключей.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл выгрузки.')
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько объектов вставлять за один запрос.'
+        )
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        total = 0
+        skipped = Counter()
+        with transaction.atomic():
+            for index, label in enumerate(MODEL_ORDER):
+                total += self.load_model(
+                    options['path'], label, options['batch_size'],
+                    skipped=skipped if index == 0 else None,
+                )
+            reset_sequences()
+            rebuild_comment_counts()
+        invalidate_scopes(GLOBAL_SCOPE)
+        if skipped:
+            details = ', '.join(
+                f'{label}: {count}' for label, count in sorted(skipped.items())
+            )
+            self.stdout.write(self.style.WARNING(
+                f'Пропущено записей моделей, которые load_dump не загружает: '
+                f'{sum(skipped.values())} ({details})'
+            ))
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено объектов: {total} за {elapsed:.1f} с '
+            f'({total / max(elapsed, 1e-9):.0f} строк/с)'
+        ))
+
+    def load_model(self, path, label, batch_size, skipped=None):
+        """Один проход по файлу: вставляет объекты только модели label.
+
+        Если передан skipped, в нём считаются записи моделей не из
+        MODEL_ORDER — достаточно сделать это в одном из проходов.
+        """
+        model = apps.get_model(label)
+        started = time.monotonic()
+        batch = []
+        m2m_batch = []
+        loaded = 0
+        for record in iter_dump(path):
+            record_label = record.get('model')
+            if record_label != label:
+                if skipped is not None and record_label not in MODEL_ORDER:
+                    skipped[record_label] += 1
+                continue
+            for deserialized in serializers.deserialize('python', [record]):
+                batch.append(deserialized.object)
+                m2m_batch.append((deserialized.object, deserialized.m2m_data))
+            if len(batch) >= batch_size:
+                loaded += self.flush(model, batch, m2m_batch, batch_size)
+        loaded += self.flush(model, batch, m2m_batch, batch_size)
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f'{label}: {loaded} объектов, '
+            f'{loaded / max(elapsed, 1e-9):.0f} строк/с'
+        )
+        return loaded
+
+    def flush(self, model, batch, m2m_batch, batch_size):
+        count = len(batch)
+        if not count:
+            return 0
+        model.objects.bulk_create(batch, batch_size=batch_size)
+        for field in model._meta.many_to_many:
+            through = field.remote_field.through
+            source = field.m2m_field_name()
+            target = field.m2m_reverse_field_name()
+            through.objects.bulk_create([
+                through(**{f'{source}_id': obj.pk, f'{target}_id': pk})
+                for obj, m2m_data in m2m_batch
+                for pk in m2m_data.get(field.name, ())
+            ], batch_size=batch_size)
+        batch.clear()
+        m2m_batch.clear()
+        return count
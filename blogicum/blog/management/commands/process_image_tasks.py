@@ -0,0 +1,121 @@
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from blog.image_tasks import (
+    claim_image_tasks,
+    complete_image_task,
+    fail_image_task,
+)
+from blog.images import ImageProcessingError, process_image
+
+logger = logging.getLogger(__name__)
+
+
+class InlineExecutor:
+    """Выполняет задачи в текущем процессе: для --workers 0 и отладки."""
+
+    def submit(self, func, *args):
+        try:
+            return func(*args), None
+        except Exception as error:
+            return None, error
+
+    def shutdown(self, wait=True):
+        pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Обрабатывает изображения публикаций из очереди в базе: уменьшенные '
+        'копии, WebP, поворот по EXIF. Работа идёт в пуле процессов, '
+        'поэтому веб-воркеры не декодируют изображения.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=2,
+            help='Размер пула процессов; 0 — обрабатывать в этом процессе.'
+        )
+        parser.add_argument(
+            '--max-tasks-per-child', type=int, default=50,
+            help='После стольких изображений процесс пула перезапускается.'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Разобрать очередь и завершиться.'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=2.0,
+            help='Пауза между опросами пустой очереди, секунд.'
+        )
+
+    def make_executor(self, options):
+        if not options['workers']:
+            return InlineExecutor()
+        # С max_tasks_per_child пул запускает процессы через spawn, поэтому
+        # им нужен django.setup().
+        return ProcessPoolExecutor(
+            max_workers=options['workers'],
+            max_tasks_per_child=options['max_tasks_per_child'],
+            initializer=django.setup,
+        )
+
+    def handle(self, *args, **options):
+        executor = self.make_executor(options)
+        # В работе не больше двух задач на процесс: остальные ждут в базе.
+        batch_size = max(options['workers'], 1) * 2
+        processed = failed = 0
+        try:
+            while True:
+                close_old_connections()
+                tasks = claim_image_tasks(batch_size)
+                if not tasks:
+                    if options['once']:
+                        break
+                    time.sleep(options['interval'])
+                    continue
+                broken = False
+                for task, meta, error in self.run(executor, tasks):
+                    if error is None:
+                        complete_image_task(task, meta)
+                        processed += 1
+                        continue
+                    logger.warning('Не удалось обработать %s: %s',
+                                   task.image, error)
+                    fail_image_task(
+                        task, error,
+                        permanent=isinstance(error, ImageProcessingError)
+                    )
+                    failed += 1
+                    broken = broken or isinstance(error, BrokenProcessPool)
+                if broken:
+                    # Процесс пула убит, например, по памяти: пул не
+                    # восстанавливается сам.
+                    executor.shutdown(wait=False)
+                    executor = self.make_executor(options)
+        finally:
+            executor.shutdown()
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано изображений: {processed}, с ошибками: {failed}'
+        ))
+
+    def run(self, executor, tasks):
+        """Отдаёт (задача, image_meta, ошибка) по мере готовности."""
+        if isinstance(executor, InlineExecutor):
+            for task in tasks:
+                yield (task, *executor.submit(process_image, task.image))
+            return
+        futures = {
+            executor.submit(process_image, task.image): task for task in tasks
+        }
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result(), None
+            except Exception as error:
+                yield futures[future], None, error
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from blog.services import rebuild_comment_counts
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики комментариев у публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Сколько публикаций обновлять за один запрос.'
+        )
+
+    def handle(self, *args, **options):
+        updated = rebuild_comment_counts(options['chunk_size'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Обновлено публикаций: {updated}')
+        )
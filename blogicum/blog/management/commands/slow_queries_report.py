@@ -0,0 +1,100 @@
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+ORDERINGS = {
+    'total': lambda shape: shape['total_ms'],
+    'max': lambda shape: shape['max_ms'],
+    'count': lambda shape: shape['count'],
+}
+
+
+def iter_log_files(path):
+    """Журнал и его ротированные копии, начиная с самой старой."""
+    path = Path(path)
+    backups = sorted(
+        (
+            backup for backup in path.parent.glob(f'{path.name}.*')
+            if backup.suffix[1:].isdigit()
+        ),
+        key=lambda backup: int(backup.suffix[1:]),
+        reverse=True,
+    )
+    yield from backups
+    if path.exists():
+        yield path
+
+
+def iter_entries(paths):
+    for path in paths:
+        with open(path, encoding='utf-8') as fp:
+            for line in fp:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+
+class Command(BaseCommand):
+    help = (
+        'Группирует журнал медленных запросов по форме запроса и выводит '
+        'самые тяжёлые формы с представлениями и планом выполнения.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--log', default=settings.SLOW_QUERY_LOG,
+            help='Журнал медленных запросов; копии .1, .2 читаются тоже.'
+        )
+        parser.add_argument('--top', type=int, default=10)
+        parser.add_argument(
+            '--order-by', choices=tuple(ORDERINGS), default='total',
+            help='Суммарное время, максимальное время или число запросов.'
+        )
+
+    def handle(self, *args, **options):
+        paths = list(iter_log_files(options['log']))
+        if not paths:
+            raise CommandError(f'Журнал {options["log"]} не найден.')
+        shapes = {}
+        for entry in iter_entries(paths):
+            shape = shapes.setdefault(entry['shape'], {
+                'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'views': {},
+                'sql': entry['sql'], 'params': entry.get('params'),
+                'plan': entry['plan'],
+            })
+            duration = entry['duration_ms']
+            shape['count'] += 1
+            shape['total_ms'] += duration
+            views = shape['views']
+            views[entry['view']] = views.get(entry['view'], 0) + 1
+            if duration >= shape['max_ms']:
+                # Пример и план берутся у самого медленного вызова.
+                shape.update(
+                    max_ms=duration, sql=entry['sql'],
+                    params=entry.get('params'), plan=entry['plan'],
+                )
+
+        worst = sorted(
+            shapes.values(), key=ORDERINGS[options['order_by']], reverse=True
+        )[:options['top']]
+        for number, shape in enumerate(worst, 1):
+            views = ', '.join(
+                f'{view} ({count})' for view, count in sorted(
+                    shape['views'].items(), key=lambda item: -item[1]
+                )
+            )
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'#{number}: {shape["count"]} запросов, '
+                f'всего {shape["total_ms"]:.1f} мс, '
+                f'среднее {shape["total_ms"] / shape["count"]:.1f} мс, '
+                f'максимум {shape["max_ms"]:.1f} мс'
+            ))
+            self.stdout.write(f'  Представления: {views}')
+            self.stdout.write(f'  SQL: {shape["sql"]}')
+            if shape['params'] is not None:
+                self.stdout.write(f'  Параметры: {shape["params"]}')
+            for step in shape['plan']:
+                self.stdout.write(f'  План: {step}')
@@ -0,0 +1,108 @@
+import multiprocessing
+import random
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+PROFILES = {
+    'default': {},
+    'production': settings.SQLITE_PRODUCTION_PRAGMAS,
+}
+
+
+def _connect(path, pragmas):
+    connection = sqlite3.connect(path, timeout=5, isolation_level=None)
+    for name, value in pragmas.items():
+        connection.execute(f'PRAGMA {name} = {value}')
+    return connection
+
+
+def _prepare(path, pragmas, rows):
+    connection = _connect(path, pragmas)
+    connection.execute(
+        'CREATE TABLE post (id INTEGER PRIMARY KEY, pub_date REAL, text TEXT)'
+    )
+    connection.execute('CREATE INDEX post_pub_date ON post (pub_date DESC)')
+    connection.execute('BEGIN')
+    connection.executemany(
+        'INSERT INTO post (pub_date, text) VALUES (?, ?)',
+        ((time.time() - i, 'x' * 500) for i in range(rows))
+    )
+    connection.execute('COMMIT')
+    connection.close()
+
+
+def _work(args):
+    path, pragmas, role, duration, rows = args
+    connection = _connect(path, pragmas)
+    done = errors = 0
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        try:
+            if role == 'read':
+                connection.execute(
+                    'SELECT id, pub_date, text FROM post '
+                    'ORDER BY pub_date DESC LIMIT 10 OFFSET ?',
+                    (random.randrange(rows),)
+                ).fetchall()
+            else:
+                connection.execute('BEGIN IMMEDIATE')
+                connection.execute(
+                    'INSERT INTO post (pub_date, text) VALUES (?, ?)',
+                    (time.time(), 'y' * 500)
+                )
+                connection.execute('COMMIT')
+            done += 1
+        except sqlite3.OperationalError:
+            errors += 1
+            if connection.in_transaction:
+                connection.execute('ROLLBACK')
+    connection.close()
+    return role, done, errors
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность SQLite на чтение и запись '
+        'без настроек и с профилем production.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument(
+            '--duration', type=float, default=5.0,
+            help='Длительность прогона одного профиля в секундах.'
+        )
+        parser.add_argument('--rows', type=int, default=10_000)
+
+    def handle(self, *args, **options):
+        for profile, pragmas in PROFILES.items():
+            with tempfile.TemporaryDirectory() as directory:
+                path = str(Path(directory) / 'benchmark.sqlite3')
+                _prepare(path, pragmas, options['rows'])
+                roles = (
+                    ['read'] * options['readers']
+                    + ['write'] * options['writers']
+                )
+                with multiprocessing.Pool(len(roles)) as pool:
+                    results = pool.map(_work, [
+                        (path, pragmas, role, options['duration'],
+                         options['rows'])
+                        for role in roles
+                    ])
+            totals = {'read': [0, 0], 'write': [0, 0]}
+            for role, done, errors in results:
+                totals[role][0] += done
+                totals[role][1] += errors
+            self.stdout.write(
+                f'{profile:>10}: '
+                f'чтений {totals["read"][0] / options["duration"]:.0f}/с, '
+                f'записей {totals["write"][0] / options["duration"]:.0f}/с, '
+                f'ошибок блокировки '
+                f'{totals["read"][1] + totals["write"][1]}'
+            )
@@ -0,0 +1,238 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value):
+    return (
+        str(value).replace('\\', r'\\').replace('\n', r'\n')
+        .replace('"', r'\"')
+    )
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ''
+    return '{' + ','.join(
+        f'{name}="{_escape(value)}"' for name, value in pairs
+    ) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value))
+
+
+class Registry:
+    """Метрики процесса.
+
+    Если задан METRICS_MULTIPROC_DIR, каждый процесс gunicorn
+    периодически сохраняет свои значения в <pid>.json этого каталога,
+    а /metrics складывает файлы всех процессов.
+    """
+
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.Lock()
+        self.pid = os.getpid()
+        self.flushed_at = 0.0
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def check_pid(self):
+        """После fork дочерний процесс начинает счёт с нуля."""
+        if os.getpid() != self.pid:
+            self.pid = os.getpid()
+            self.flushed_at = 0.0
+            for metric in self.metrics.values():
+                metric.values.clear()
+
+    def snapshot(self):
+        with self.lock:
+            self.check_pid()
+            return {
+                name: {
+                    json.dumps(key): metric.copy_value(value)
+                    for key, value in metric.values.items()
+                }
+                for name, metric in self.metrics.items()
+            }
+
+    def _directory(self):
+        directory = getattr(settings, 'METRICS_MULTIPROC_DIR', None)
+        return Path(directory) if directory else None
+
+    def flush(self, force=False):
+        """Сохраняет значения процесса не чаще METRICS_FLUSH_INTERVAL."""
+        directory = self._directory()
+        if directory is None:
+            return
+        now = time.monotonic()
+        interval = settings.METRICS_FLUSH_INTERVAL
+        if not force and now - self.flushed_at < interval:
+            return
+        self.flushed_at = now
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f'{os.getpid()}.json'
+        temporary = path.with_suffix('.tmp')
+        temporary.write_text(json.dumps(self.snapshot()), encoding='utf-8')
+        os.replace(temporary, path)
+
+    def collect(self):
+        """Значения всех процессов: {имя: {ключ меток: значение}}."""
+        directory = self._directory()
+        if directory is None:
+            return self.snapshot()
+        self.flush(force=True)
+        merged = {}
+        for path in directory.glob('*.json'):
+            try:
+                data = json.loads(path.read_text(encoding='utf-8'))
+            except (OSError, ValueError):
+                continue
+            for name, values in data.items():
+                metric = self.metrics.get(name)
+                if metric is None:
+                    continue
+                target = merged.setdefault(name, {})
+                for key, value in values.items():
+                    target[key] = metric.merge(target.get(key), value)
+        return merged
+
+    def render(self):
+        """Все метрики в текстовом формате Prometheus."""
+        collected = self.collect()
+        lines = []
+        for name, metric in self.metrics.items():
+            lines.append(f'# HELP {name} {_escape(metric.documentation)}')
+            lines.append(f'# TYPE {name} {metric.type}')
+            for key, value in sorted(collected.get(name, {}).items()):
+                lines.extend(metric.expose(json.loads(key), value))
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+
+class Metric:
+    type = None
+
+    def __init__(self, name, documentation, labelnames=(),
+                 registry=REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.registry = registry
+        self.values = {}
+        registry.register(self)
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f'{self.name}: ожидались метки {self.labelnames}.'
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.registry.lock:
+            self.registry.check_pid()
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def copy_value(self, value):
+        return value
+
+    def merge(self, total, value):
+        return (total or 0) + value
+
+    def expose(self, labelvalues, value):
+        labels = _format_labels(self.labelnames, labelvalues)
+        return [f'{self.name}{labels} {_format_value(value)}']
+
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(),
+                 buckets=DEFAULT_BUCKETS, registry=REGISTRY):
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+
+    def observe(self, amount, **labels):
+        key = self._key(labels)
+        with self.registry.lock:
+            self.registry.check_pid()
+            value = self.values.get(key)
+            if value is None:
+                value = self.values[key] = [[0] * len(self.buckets), 0.0]
+            counts = value[0]
+            for index, bound in enumerate(self.buckets):
+                if amount <= bound:
+                    counts[index] += 1
+                    break
+            value[1] += amount
+
+    def copy_value(self, value):
+        return [list(value[0]), value[1]]
+
+    def merge(self, total, value):
+        if total is None:
+            return self.copy_value(value)
+        return [
+            [a + b for a, b in zip(total[0], value[0])],
+            total[1] + value[1],
+        ]
+
+    def expose(self, labelvalues, value):
+        counts, total = value
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, counts):
+            cumulative += count
+            labels = _format_labels(
+                self.labelnames, labelvalues, [('le', _format_value(bound))]
+            )
+            lines.append(f'{self.name}_bucket{labels} {cumulative}')
+        labels = _format_labels(self.labelnames, labelvalues)
+        lines.append(f'{self.name}_sum{labels} {_format_value(total)}')
+        lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+
+REQUEST_LATENCY = Histogram(
+    'blog_request_duration_seconds',
+    'Время обработки запроса по представлениям.',
+    ('view', 'method'),
+)
+DB_QUERIES = Counter(
+    'blog_db_queries_total', 'SQL-запросы по представлениям.', ('view',)
+)
+PAGES_NOT_FOUND = Counter(
+    'blog_page_not_found_total', 'Ответы 404.'
+)
+COMMENTS_CREATED = Counter(
+    'blog_comments_created_total', 'Созданные комментарии.'
+)
+CACHE_REQUESTS = Counter(
+    'blog_cache_requests_total',
+    'Обращения к кэшу страниц для анонимов (page) и к кэшу фрагментов '
+    'шаблонов (по имени фрагмента).',
+    ('cache', 'result'),
+)
@@ -0,0 +1,70 @@
+import logging
+import time
+from http import HTTPStatus
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from blog.instrumentation import collect_request_stats, get_view_name
+from blog.metrics import (
+    DB_QUERIES,
+    PAGES_NOT_FOUND,
+    REGISTRY,
+    REQUEST_LATENCY,
+)
+
+logger = logging.getLogger('blog.requests')
+
+
+class RequestTimingMiddleware:
+    """Добавляет к ответу Server-Timing, пишет строку в журнал и метрики.
+
+    sql — время и число запросов к базе, tpl — отрисовка шаблонов,
+    view — остальное время представления вместе с его SQL.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'REQUEST_TIMING', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        with collect_request_stats(request) as stats:
+            response = self.get_response(request)
+        total = (time.perf_counter() - started) * 1000
+        sql = stats.sql_time * 1000
+        template = stats.template_time * 1000
+        view = max(total - template, 0.0)
+        response['Server-Timing'] = ', '.join((
+            f'sql;dur={sql:.1f};desc="{stats.queries} queries"',
+            f'tpl;dur={template:.1f}',
+            f'view;dur={view:.1f}',
+            f'total;dur={total:.1f}',
+        ))
+        view_name = get_view_name(request)
+        logger.info(
+            'view=%s method=%s status=%s queries=%d sql_ms=%.1f '
+            'tpl_ms=%.1f view_ms=%.1f total_ms=%.1f',
+            view_name, request.method, response.status_code, stats.queries,
+            sql, template, view, total,
+            extra={
+                'view_name': view_name,
+                'method': request.method,
+                'status': response.status_code,
+                'queries': stats.queries,
+                'sql_ms': round(sql, 1),
+                'tpl_ms': round(template, 1),
+                'view_ms': round(view, 1),
+                'total_ms': round(total, 1),
+            },
+        )
+        REQUEST_LATENCY.observe(
+            total / 1000, view=view_name, method=request.method
+        )
+        DB_QUERIES.inc(stats.queries, view=view_name)
+        if response.status_code == HTTPStatus.NOT_FOUND:
+            # Не в handler404: при DEBUG = True он не вызывается.
+            PAGES_NOT_FOUND.inc()
+        REGISTRY.flush()
+        return response
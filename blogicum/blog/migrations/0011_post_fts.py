@@ -0,0 +1,91 @@
+from django.conf import settings
+from django.db import migrations
+
+FTS_TABLE = 'blog_post_fts'
+
+
+def get_trigger_statements(post_table, user_table):
+    author_username = (
+        f'(SELECT username FROM {user_table} WHERE id = new.author_id)'
+    )
+    return [
+        f"""CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON {post_table}
+            BEGIN
+                INSERT INTO {FTS_TABLE} (rowid, title, text, author_username)
+                VALUES (new.id, new.title, new.text, {author_username});
+            END""",
+        f"""CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON {post_table}
+            BEGIN
+                DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+            END""",
+        f"""CREATE TRIGGER {FTS_TABLE}_au
+            AFTER UPDATE OF title, text, author_id ON {post_table}
+            BEGIN
+                DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+                INSERT INTO {FTS_TABLE} (rowid, title, text, author_username)
+                VALUES (new.id, new.title, new.text, {author_username});
+            END""",
+        f"""CREATE TRIGGER {FTS_TABLE}_user_au
+            AFTER UPDATE OF username ON {user_table}
+            BEGIN
+                UPDATE {FTS_TABLE} SET author_username = new.username
+                WHERE rowid IN (
+                    SELECT id FROM {post_table} WHERE author_id = new.id
+                );
+            END""",
+    ]
+
+
+def create_triggers(apps, schema_editor):
+    """Триггеры синхронизации; SQLite теряет их при пересоздании таблицы."""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    post_table = apps.get_model('blog', 'Post')._meta.db_table
+    user_table = apps.get_model(settings.AUTH_USER_MODEL)._meta.db_table
+    for statement in get_trigger_statements(post_table, user_table):
+        schema_editor.execute(statement)
+
+
+def drop_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for trigger in ('ai', 'ad', 'au', 'user_au'):
+        schema_editor.execute(f'DROP TRIGGER IF EXISTS {FTS_TABLE}_{trigger}')
+
+
+def create_post_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    post_table = apps.get_model('blog', 'Post')._meta.db_table
+    user_table = apps.get_model(settings.AUTH_USER_MODEL)._meta.db_table
+    schema_editor.execute(
+        f"""CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+            title, text, author_username,
+            tokenize = 'unicode61 remove_diacritics 2'
+        )"""
+    )
+    schema_editor.execute(
+        f"""INSERT INTO {FTS_TABLE} (rowid, title, text, author_username)
+            SELECT p.id, p.title, p.text, u.username
+            FROM {post_table} p JOIN {user_table} u ON u.id = p.author_id"""
+    )
+    create_triggers(apps, schema_editor)
+
+
+def drop_post_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    drop_triggers(apps, schema_editor)
+    schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_category_location_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(create_post_fts, drop_post_fts),
+    ]
@@ -0,0 +1,30 @@
+from importlib import import_module
+
+from django.db import migrations, models
+
+# SQLite пересоздаёт blog_post при добавлении поля, а триггеры полнотекстового
+# поиска из 0011 ссылаются на эту таблицу: снимаем их на время операции.
+post_fts = import_module('blog.migrations.0011_post_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_post_fts'),
+    ]
+
+    operations = [
+        migrations.RunPython(post_fts.drop_triggers, post_fts.create_triggers),
+        migrations.AddField(
+            model_name='post',
+            name='image_meta',
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                editable=False,
+                help_text='Размеры изображения; заполняются при загрузке.',
+                verbose_name='Сведения об изображении',
+            ),
+        ),
+        migrations.RunPython(post_fts.create_triggers, post_fts.drop_triggers),
+    ]
@@ -0,0 +1,31 @@
+from importlib import import_module
+
+import blog.storage
+from django.db import migrations, models
+
+# SQLite пересоздаёт blog_post и при смене storage: снимаем триггеры
+# полнотекстового поиска из 0011 на время операции, как в 0012.
+post_fts = import_module('blog.migrations.0011_post_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0013_imagetask'),
+    ]
+
+    operations = [
+        migrations.RunPython(post_fts.drop_triggers, post_fts.create_triggers),
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(
+                blank=True,
+                null=True,
+                storage=blog.storage.HashedFileSystemStorage(),
+                upload_to='posts/',
+                verbose_name='Изображение',
+            ),
+        ),
+        migrations.RunPython(post_fts.create_triggers, post_fts.drop_triggers),
+    ]
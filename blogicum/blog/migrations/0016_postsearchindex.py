@@ -0,0 +1,29 @@
+# Generated by Django 5.1.1 on 2026-10-18 05:40
+
+import blog.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0015_post_image_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostSearchIndex',
+            fields=[
+                ('post', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='blog.post')),
+                ('document', blog.models.SearchDocumentField(db_column='blog_post_fts')),
+                ('title', models.TextField()),
+                ('text', models.TextField()),
+                ('author_username', models.TextField()),
+            ],
+            options={
+                'db_table': 'blog_post_fts',
+                'managed': False,
+            },
+        ),
+    ]
@@ -2,9 +2,29 @@ from django.shortcuts import redirect
 
 
 class AuthorPermissionMixin:
-    """Миксин для проверки авторства."""
+    """Миксин для проверки авторства.
+
+    Объект загружается один раз за запрос вместе с автором и
+    переиспользуется в dispatch и в get/post generic-представлений.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().select_related('author')
+
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return super().get_object(queryset)
+        if not hasattr(self, '_object'):
+            self._object = super().get_object()
+        return self._object
+
+    def not_author_response(self, obj):
+        """Ответ пользователю, который не автор объекта."""
+        return redirect('blog:post_detail',
+                        post_id=getattr(obj, 'post_id', obj.pk))
 
     def dispatch(self, request, *args, **kwargs):
-        if self.get_object().author != request.user:
-            return redirect('blog:post_detail', post_id=self.get_object().pk)
+        obj = self.get_object()
+        if obj.author_id != request.user.pk:
+            return self.not_author_response(obj)
         return super().dispatch(request, *args, **kwargs)
@@ -1,13 +1,16 @@
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.utils import timezone
 
-from blog.constants import TITLE_TRUNCATE_LIMIT
+from blog.constants import IMAGE_SIZES, TITLE_TRUNCATE_LIMIT
+from blog.images import build_srcset, build_webp_srcset, fallback_url
+from blog.storage import post_image_storage
 
 User = get_user_model()
 
 
 class PublishedCreatedModel(models.Model):
-    """Абстрактная модель с полями is_published и created_at."""
+    """Абстрактная модель с полями is_published, created_at и updated_at."""
 
     is_published = models.BooleanField(
         default=True,
@@ -18,6 +21,10 @@ class PublishedCreatedModel(models.Model):
         auto_now_add=True,
         verbose_name='Добавлено'
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Изменено'
+    )
 
     class Meta:
         abstract = True
@@ -54,6 +61,26 @@ class Location(PublishedCreatedModel):
         return self.name
 
 
+class PostQuerySet(models.QuerySet):
+    @staticmethod
+    def _published_q():
+        return models.Q(
+            is_published=True,
+            pub_date__lte=timezone.now(),
+            category__is_published=True
+        )
+
+    def published(self):
+        """Посты, видимые всем: опубликованные и уже вышедшие."""
+        return self.filter(self._published_q())
+
+    def visible_to(self, user):
+        """Опубликованные посты и все посты самого пользователя."""
+        if not user.is_authenticated:
+            return self.published()
+        return self.filter(self._published_q() | models.Q(author=user))
+
+
 class Post(PublishedCreatedModel):
     title = models.CharField(max_length=256, verbose_name='Заголовок')
     text = models.TextField(verbose_name='Текст')
@@ -81,19 +108,108 @@ class Post(PublishedCreatedModel):
     )
     image = models.ImageField(
         upload_to='posts/',
+        storage=post_image_storage,
         blank=True,
         null=True,
         verbose_name='Изображение'
     )
+    image_meta = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name='Сведения об изображении',
+        help_text='Размеры изображения и состояние его обработки.'
+    )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев'
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         ordering = ['-pub_date']
+        indexes = [
+            models.Index(
+                fields=['-pub_date', '-id'],
+                condition=models.Q(is_published=True),
+                name='post_published_feed_idx'
+            ),
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='post_author_pub_date_idx'
+            ),
+            models.Index(
+                fields=['category', '-pub_date', '-id'],
+                condition=models.Q(is_published=True),
+                name='post_category_feed_idx'
+            ),
+            # Поиск ссылок на файл: счётчик ссылок и сборка мусора в media.
+            models.Index(fields=['image'], name='post_image_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
+    @property
+    def image_srcset(self):
+        """Атрибут srcset по сохранённой ширине, без чтения файла."""
+        if not self.image or not self.image_width:
+            return ''
+        return build_srcset(self.image.name, self.image_width)
+
+    @property
+    def image_width(self):
+        return self.image_meta.get('width')
+
+    @property
+    def image_height(self):
+        return self.image_meta.get('height')
+
+    @property
+    def image_pending(self):
+        """Изображение ждёт обработки в очереди process_image_tasks."""
+        return self.image_meta.get('status') == 'pending'
+
+    @property
+    def image_failed(self):
+        return self.image_meta.get('status') == 'failed'
+
+    @property
+    def image_color(self):
+        """Основной цвет изображения: фон, пока оно загружается."""
+        return self.image_meta.get('color', '')
+
+    @property
+    def image_lqip(self):
+        """Размытое превью как data URI."""
+        return self.image_meta.get('lqip', '')
+
+    @property
+    def image_webp_srcset(self):
+        if not self.image_meta.get('webp'):
+            return ''
+        return build_webp_srcset(self.image.name, self.image_width)
+
+    @property
+    def image_sizes(self):
+        return IMAGE_SIZES
+
+    @property
+    def card_image_url(self):
+        if not self.image_width:
+            return self.image.url
+        return fallback_url(self.image.name, self.image_width, 'card')
+
+    @property
+    def detail_image_url(self):
+        if not self.image_width:
+            return self.image.url
+        return fallback_url(self.image.name, self.image_width, 'detail')
+
 
 class Comment(models.Model):
     post = models.ForeignKey(
@@ -124,3 +240,97 @@ class Comment(models.Model):
             f'{self.text[:TITLE_TRUNCATE_LIMIT]}... '
             f'к посту {self.post}'
         )
+
+
+class ImageTask(models.Model):
+    """Задача обработки изображения публикации в очереди в базе."""
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'В очереди'
+        PROCESSING = 'processing', 'Обрабатывается'
+        FAILED = 'failed', 'Ошибка'
+
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='image_tasks',
+        verbose_name='Публикация'
+    )
+    image = models.CharField(
+        max_length=255,
+        verbose_name='Файл',
+        help_text='Имя файла на момент постановки в очередь.'
+    )
+    status = models.CharField(
+        max_length=16,
+        choices=Status.choices,
+        default=Status.PENDING,
+        verbose_name='Состояние'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Попыток'
+    )
+    error = models.TextField(blank=True, verbose_name='Ошибка')
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Добавлено'
+    )
+    locked_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Взята в работу'
+    )
+
+    class Meta:
+        verbose_name = 'обработка изображения'
+        verbose_name_plural = 'Обработка изображений'
+        ordering = ['pk']
+        indexes = [
+            models.Index(fields=['status', 'id'], name='imagetask_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.image} ({self.get_status_display()})'
+
+
+class Match(models.Lookup):
+    """document__match=запрос: полнотекстовый MATCH FTS5."""
+
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', [*lhs_params, *rhs_params]
+
+
+class SearchDocumentField(models.TextField):
+    """Скрытый столбец FTS5 с именем таблицы: по нему ищут MATCH."""
+
+
+SearchDocumentField.register_lookup(Match)
+
+
+class PostSearchIndex(models.Model):
+    """Таблица FTS5 blog_post_fts из миграции 0011, только для чтения.
+
+    Строки поддерживают триггеры; модель нужна, чтобы присоединять
+    индекс к постам в ORM.
+    """
+
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column='rowid',
+        related_name='search_index',
+    )
+    document = SearchDocumentField(db_column='blog_post_fts')
+    title = models.TextField()
+    text = models.TextField()
+    author_username = models.TextField()
+
+    class Meta:
+        managed = False
+        db_table = 'blog_post_fts'
@@ -0,0 +1,219 @@
+import base64
+import binascii
+from datetime import datetime
+
+from django.core.cache import cache
+from django.core.paginator import Page, Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from blog.constants import (
+    FEED_COUNT_LIMIT,
+    FEED_COUNT_SAMPLE,
+    MAX_OFFSET_PAGE,
+    PAGE_RANGE_ON_EACH_SIDE,
+    PAGE_RANGE_ON_ENDS,
+)
+
+CURSOR_ORDERING = ('-pub_date', '-pk')
+
+
+def encode_cursor(obj, key='pub_date'):
+    """Упаковывает ключ (key, id) объекта в непрозрачный токен."""
+    raw = f'{getattr(obj, key).isoformat()}|{obj.pk}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Распаковывает токен в (значение ключа, id); ValueError при ошибке."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        pub_date, pk = raw.rsplit('|', 1)
+        return datetime.fromisoformat(pub_date), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as error:
+        raise ValueError('Некорректный курсор') from error
+
+
+class FeedPage(Page):
+    """Страница с номером, умеющая отдавать курсоры соседних страниц."""
+
+    @property
+    def page_range(self):
+        """Номера страниц у краёв и вокруг текущей, пропуски — ELLIPSIS.
+
+        Страницы дальше max_page не показываются: туда ведут курсоры.
+        """
+        ellipsis = self.paginator.ELLIPSIS
+        page_range = []
+        for number in self.paginator.get_elided_page_range(
+            self.number,
+            on_each_side=PAGE_RANGE_ON_EACH_SIDE,
+            on_ends=PAGE_RANGE_ON_ENDS,
+        ):
+            if number != ellipsis and number > self.paginator.max_page:
+                number = ellipsis
+            if number == ellipsis and page_range[-1:] == [ellipsis]:
+                continue
+            page_range.append(number)
+        return page_range
+
+    def has_next(self):
+        if getattr(self.paginator, 'estimated', False) and (
+            len(self) < self.paginator.per_page
+        ):
+            # Оценка числа объектов могла оказаться завышенной.
+            return False
+        return super().has_next()
+
+    @property
+    def next_cursor(self):
+        if not self.has_next():
+            return None
+        return encode_cursor(self[len(self) - 1])
+
+    @property
+    def previous_cursor(self):
+        if not self.has_previous():
+            return None
+        return encode_cursor(self[0])
+
+
+class FeedPaginator(Paginator):
+    """Лента, в которой по номеру открываются первые max_page страниц."""
+
+    max_page = MAX_OFFSET_PAGE
+
+    @property
+    def last_linked_page(self):
+        return min(self.num_pages, self.max_page)
+
+    def _get_page(self, *args, **kwargs):
+        return FeedPage(*args, **kwargs)
+
+
+class CachedCountPaginator(FeedPaginator):
+    """Постраничная лента, которая хранит число объектов в кэше.
+
+    Если объектов больше count_limit, точный COUNT(*) не выполняется:
+    число оценивается по доле подходящих среди последних sample_size id.
+    get_timeout вызывается только при промахе кэша.
+    """
+
+    def __init__(self, object_list, per_page, cache_key, get_timeout,
+                 count_limit=FEED_COUNT_LIMIT,
+                 sample_size=FEED_COUNT_SAMPLE, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.cache_key = cache_key
+        self.get_timeout = get_timeout
+        self.count_limit = count_limit
+        self.sample_size = sample_size
+        self.estimated = False
+
+    @cached_property
+    def count(self):
+        cached = cache.get(self.cache_key)
+        if cached is None:
+            cached = self._count()
+            cache.set(self.cache_key, cached, self.get_timeout())
+        total, self.estimated = cached
+        return total
+
+    def _count(self):
+        queryset = self.object_list.order_by()
+        total = queryset[:self.count_limit + 1].count()
+        if total <= self.count_limit:
+            return total, False
+        return max(total, self._estimate(queryset)), True
+
+    def _estimate(self, queryset):
+        max_pk = queryset.model._base_manager.order_by('-pk').values_list(
+            'pk', flat=True
+        ).first()
+        sample = queryset.filter(pk__gt=max_pk - self.sample_size).count()
+        return round(max_pk * sample / self.sample_size)
+
+
+class CursorPage:
+    """Страница курсорной пагинации с интерфейсом, как у page_obj."""
+
+    number = None
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return f'<CursorPage: {len(self)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if not self._has_next or not self.object_list:
+            return None
+        return encode_cursor(self.object_list[-1], self.paginator.key)
+
+    @property
+    def previous_cursor(self):
+        if not self._has_previous or not self.object_list:
+            return None
+        return encode_cursor(self.object_list[0], self.paginator.key)
+
+
+class CursorPaginator:
+    """Пагинация по ключу (key, id) без OFFSET и COUNT(*).
+
+    По умолчанию — лента постов от новых к старым по pub_date.
+    """
+
+    def __init__(self, queryset, per_page, key='pub_date', descending=True):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.key = key
+        self.descending = descending
+
+    def _slice(self, cursor, forward):
+        descending = self.descending == forward
+        direction = 'lt' if descending else 'gt'
+        queryset = self.queryset
+        if cursor is not None:
+            value, pk = cursor
+            queryset = queryset.filter(
+                Q(**{f'{self.key}__{direction}': value})
+                | Q(**{self.key: value, f'pk__{direction}': pk})
+            )
+        ordering = (f'-{self.key}', '-pk') if descending else (self.key, 'pk')
+        return list(queryset.order_by(*ordering)[:self.per_page + 1])
+
+    def page(self, after=None, before=None):
+        if after is None and before is not None:
+            object_list = self._slice(before, forward=False)
+            if len(object_list) <= self.per_page:
+                return self.page()
+            return CursorPage(
+                object_list[:self.per_page][::-1], self, True, True
+            )
+        object_list = self._slice(after, forward=True)
+        has_next = len(object_list) > self.per_page
+        return CursorPage(
+            object_list[:self.per_page], self, has_next, after is not None
+        )
@@ -1,27 +1,143 @@
-from django.core.paginator import Paginator
-from django.db.models import Count
-from django.utils import timezone
+from django.db import connection
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Coalesce
+from django.http import Http404
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
 
-from blog.constants import PAGINATE_BY
-from blog.models import Post
+from blog.cache import get_feed_count_key, get_feed_count_timeout
+from blog.constants import COMMENTS_PER_PAGE, PAGINATE_BY
+from blog.models import Comment, Post
+from blog.paginators import (
+    CURSOR_ORDERING,
+    CachedCountPaginator,
+    CursorPaginator,
+    FeedPaginator,
+    decode_cursor,
+)
 
 
 def get_published_posts(queryset=None):
     if queryset is None:
         queryset = Post.objects
-    now = timezone.now()
-    return queryset.filter(
-        is_published=True,
-        pub_date__lte=now,
-        category__is_published=True
-    ).select_related(
+    return queryset.published().select_related(
         'author', 'location', 'category'
-    ).annotate(
-        comment_count=Count('comments')
     )
 
 
-def get_paginator(queryset, request):
-    paginator = Paginator(queryset, PAGINATE_BY)
+def get_paginator(queryset, request, count_scope=None,
+                  count_variant='published'):
+    """Страница ленты по ?page= или по курсору ?after=/?before=.
+
+    С count_scope число постов берётся из кэша (см. get_feed_count_key).
+    """
+    queryset = queryset.order_by(*CURSOR_ORDERING)
+    after = request.GET.get('after')
+    before = request.GET.get('before')
+    if after or before:
+        try:
+            return CursorPaginator(queryset, PAGINATE_BY).page(
+                after=decode_cursor(after) if after else None,
+                before=decode_cursor(before) if before else None,
+            )
+        except ValueError:
+            pass
+    if count_scope is None:
+        paginator = FeedPaginator(queryset, PAGINATE_BY)
+    else:
+        paginator = CachedCountPaginator(
+            queryset, PAGINATE_BY,
+            cache_key=get_feed_count_key(count_scope, count_variant),
+            get_timeout=get_feed_count_timeout,
+        )
     page_number = request.GET.get('page')
+    try:
+        too_deep = int(page_number) > paginator.max_page
+    except (TypeError, ValueError):
+        too_deep = False
+    if too_deep:
+        raise Http404('Дальние страницы ленты открываются по курсору.')
     return paginator.get_page(page_number)
+
+
+def get_comments_page(post, request):
+    """Порция комментариев поста после курсора ?after= по (created_at, id)."""
+    paginator = CursorPaginator(
+        post.comments.select_related('author'),
+        COMMENTS_PER_PAGE,
+        key='created_at',
+        descending=False,
+    )
+    try:
+        after = decode_cursor(request.GET['after'])
+    except (KeyError, ValueError):
+        after = None
+    return paginator.page(after=after)
+
+
+def recount_comments(posts):
+    """Пересчитывает comment_count у постов queryset одним UPDATE."""
+    counts = Comment.objects.filter(
+        post=OuterRef('pk')
+    ).order_by().values('post').annotate(total=Count('pk')).values('total')
+    return posts.update(comment_count=Coalesce(Subquery(counts), 0))
+
+
+def rebuild_comment_counts(chunk_size=1000):
+    """Пересчитывает Post.comment_count порциями по диапазонам id."""
+    last_pk = 0
+    updated = 0
+    while True:
+        pks = list(
+            Post.objects.filter(pk__gt=last_pk).order_by('pk').values_list(
+                'pk', flat=True
+            )[:chunk_size]
+        )
+        if not pks:
+            return updated
+        updated += recount_comments(
+            Post.objects.filter(pk__gte=pks[0], pk__lte=pks[-1])
+        )
+        last_pk = pks[-1]
+
+
+FTS_TABLE = 'blog_post_fts'
+SNIPPET_START, SNIPPET_END = '\x02', '\x03'
+
+
+def build_fts_query(query):
+    """Превращает пользовательский ввод в безопасный запрос FTS5."""
+    terms = [term.replace('"', '') for term in query.split()]
+    return ' '.join(f'"{term}"*' for term in terms if term)
+
+
+def search_posts(query):
+    """Опубликованные посты по запросу, отсортированные по BM25."""
+    fts_query = build_fts_query(query)
+    posts = get_published_posts()
+    if not fts_query:
+        return posts.none()
+    if connection.vendor != 'sqlite':
+        return posts.filter(
+            Q(title__icontains=query) | Q(text__icontains=query)
+        ).order_by('-pub_date')
+    # Фильтр по search_index присоединяет blog_post_fts под её же именем,
+    # поэтому bm25() и snippet() видят строку, найденную MATCH.
+    return posts.filter(search_index__document__match=fts_query).annotate(
+        rank=RawSQL(f'bm25({FTS_TABLE}, 10.0, 1.0, 2.0)', ()),
+        raw_snippet=RawSQL(
+            f"snippet({FTS_TABLE}, -1, '{SNIPPET_START}', "
+            f"'{SNIPPET_END}', '…', 16)",
+            (),
+        ),
+    ).order_by('rank', '-pub_date')
+
+
+def highlight_snippet(raw_snippet):
+    """Экранирует фрагмент FTS5 и подсвечивает найденные слова."""
+    return mark_safe(
+        escape(raw_snippet)
+        .replace(SNIPPET_START, '<mark>')
+        .replace(SNIPPET_END, '</mark>')
+    )
@@ -0,0 +1,173 @@
+from django.contrib.auth import get_user_model
+from django.db.models import F, QuerySet
+from django.db.models.signals import (
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from blog.cache import GLOBAL_SCOPE, get_post_scopes, invalidate_scopes
+from blog.metrics import COMMENTS_CREATED
+from blog.models import Category, Comment, Location, Post
+from blog.image_tasks import enqueue_post_image
+from blog.services import recount_comments
+
+User = get_user_model()
+
+# Поля пользователя, которые показываются на страницах блога.
+USER_PAGE_FIELDS = ('username', 'first_name', 'last_name', 'is_staff')
+
+
+def with_count_scopes(scopes):
+    """Добавляет к областям страниц области числа постов в лентах."""
+    return [*scopes, *(f'count:{scope}' for scope in scopes)]
+
+
+def is_cascade(origin, *models):
+    """Удаление началось с объекта или queryset одной из моделей.
+
+    Тогда комментарии и посты удаляются каскадом, и счётчики и кэш
+    обновляются один раз для родителя, а не для каждой строки.
+    """
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return issubclass(model, models)
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        Post.objects.filter(pk=instance.post_id).update(
+            comment_count=F('comment_count') + 1
+        )
+        COMMENTS_CREATED.inc()
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, origin=None, **kwargs):
+    if is_cascade(origin, Post, User):
+        return
+    Post.objects.filter(
+        pk=instance.post_id, comment_count__gt=0
+    ).update(comment_count=F('comment_count') - 1)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_pages(sender, instance, origin=None, **kwargs):
+    if is_cascade(origin, Post, User):
+        return
+    invalidate_scopes(
+        f'post:{instance.post_id}', *get_post_scopes(instance.post_id)
+    )
+
+
+@receiver(pre_save, sender=Post)
+@receiver(pre_delete, sender=Post)
+def remember_post_scopes(sender, instance, raw=False, origin=None,
+                         **kwargs):
+    if is_cascade(origin, User):
+        return
+    if instance.pk and not raw:
+        instance._old_page_scopes = get_post_scopes(instance.pk)
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_image(sender, instance, raw=False, **kwargs):
+    if instance.pk and not raw:
+        instance._old_image = Post.objects.filter(
+            pk=instance.pk
+        ).values_list('image', flat=True).first()
+
+
+@receiver(post_save, sender=Post)
+def update_post_image(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    name = instance.image.name if instance.image else ''
+    if name == (getattr(instance, '_old_image', None) or ''):
+        return
+    # Прежний файл не удаляется здесь: на него может сослаться
+    # одновременная загрузка того же содержимого. Файлы без ссылок
+    # убирает delete_orphaned_media.
+    enqueue_post_image(instance)
+
+
+@receiver(post_save, sender=Post)
+def invalidate_saved_post_pages(sender, instance, **kwargs):
+    invalidate_scopes(*with_count_scopes([
+        *getattr(instance, '_old_page_scopes', []),
+        *get_post_scopes(instance.pk),
+    ]))
+
+
+@receiver(post_delete, sender=Post)
+def invalidate_deleted_post_pages(sender, instance, origin=None, **kwargs):
+    if is_cascade(origin, User):
+        return
+    invalidate_scopes(f'post:{instance.pk}', *with_count_scopes(
+        ['index', *getattr(instance, '_old_page_scopes', [])]
+    ))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_all_pages(sender, **kwargs):
+    invalidate_scopes(GLOBAL_SCOPE)
+
+
+@receiver(pre_delete, sender=User)
+def remember_commented_posts(sender, instance, **kwargs):
+    """Чужие посты, где у удаляемого пользователя есть комментарии."""
+    instance._commented_post_ids = list(
+        Comment.objects.filter(author=instance)
+        .exclude(post__author=instance)
+        .values_list('post_id', flat=True).distinct()
+    )
+
+
+@receiver(post_delete, sender=User)
+def recount_after_user_delete(sender, instance, **kwargs):
+    post_ids = getattr(instance, '_commented_post_ids', [])
+    if post_ids:
+        recount_comments(Post.objects.filter(pk__in=post_ids))
+    invalidate_scopes(GLOBAL_SCOPE)
+
+
+@receiver(pre_save, sender=User)
+def remember_user_fields(sender, instance, raw=False, update_fields=None,
+                         **kwargs):
+    if raw or not instance.pk:
+        return
+    if update_fields is not None and not (
+        set(update_fields) & set(USER_PAGE_FIELDS)
+    ):
+        return
+    instance._old_page_fields = User.objects.filter(
+        pk=instance.pk
+    ).values_list(*USER_PAGE_FIELDS).first()
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_pages(sender, instance, created, **kwargs):
+    """Сбрасывает кэш, только если изменилось то, что видно на страницах.
+
+    Имя пользователя есть на всех карточках его постов, остальные
+    поля — только в профиле. Вход, смена пароля и регистрация кэш
+    не трогают.
+    """
+    old = getattr(instance, '_old_page_fields', None)
+    if created or old is None:
+        return
+    old = dict(zip(USER_PAGE_FIELDS, old))
+    changed = {
+        name for name in USER_PAGE_FIELDS
+        if old[name] != getattr(instance, name)
+    }
+    if 'username' in changed:
+        invalidate_scopes(GLOBAL_SCOPE)
+    elif changed:
+        invalidate_scopes(f'profile:{instance.username}')
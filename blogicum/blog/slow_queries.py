@@ -0,0 +1,77 @@
+import json
+import logging
+import re
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.utils import timezone
+
+logger = logging.getLogger('blog.slow_queries')
+
+_explaining = ContextVar('blog_explaining', default=False)
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_LIST_RE = re.compile(r'\(\s*(?:\?|%s)(?:\s*,\s*(?:\?|%s))*\s*\)')
+_SPACE_RE = re.compile(r'\s+')
+
+
+def normalize_sql(sql):
+    """Форма запроса: без литералов и с одним параметром в списках IN."""
+    shape = _STRING_RE.sub('?', sql)
+    shape = _NUMBER_RE.sub('?', shape)
+    shape = _LIST_RE.sub('(...)', shape)
+    return _SPACE_RE.sub(' ', shape).strip()
+
+
+def is_explaining():
+    """Идёт ли сейчас EXPLAIN медленного запроса."""
+    return _explaining.get()
+
+
+def explain_query(connection, sql, params):
+    """План выполнения SELECT-запроса или пустой список."""
+    if not sql.lstrip().upper().startswith('SELECT'):
+        return []
+    prefix = (
+        'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite' else 'EXPLAIN '
+    )
+    token = _explaining.set(True)
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(prefix + sql, params)
+            rows = cursor.fetchall()
+    except DatabaseError:
+        return []
+    finally:
+        _explaining.reset(token)
+    if connection.vendor == 'sqlite':
+        # Строки плана SQLite: (id, parent, notused, detail).
+        return [row[-1] for row in rows]
+    return [' '.join(map(str, row)) for row in rows]
+
+
+def log_slow_query(connection, sql, params, many, duration, view_name):
+    """Пишет в журнал запрос дольше SLOW_QUERY_THRESHOLD_MS.
+
+    Параметры пишутся только при SLOW_QUERY_LOG_PARAMS.
+    """
+    duration_ms = duration * 1000
+    if (
+        duration_ms < settings.SLOW_QUERY_THRESHOLD_MS
+        or not logger.isEnabledFor(logging.WARNING)
+    ):
+        return
+    plan = [] if many else explain_query(connection, sql, params)
+    logger.warning(json.dumps({
+        'time': timezone.now().isoformat(),
+        'view': view_name,
+        'duration_ms': round(duration_ms, 2),
+        'shape': normalize_sql(sql),
+        'sql': sql,
+        'params': (
+            params if settings.SLOW_QUERY_LOG_PARAMS and not many else None
+        ),
+        'plan': plan,
+    }, ensure_ascii=False, default=str))
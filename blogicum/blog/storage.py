@@ -0,0 +1,60 @@
+import hashlib
+import os
+import re
+from pathlib import PurePosixPath
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+# posts/ab/<sha256>.jpg и его копии posts/ab/<sha256>.w640.webp.
+HASHED_NAME_RE = re.compile(
+    r'(?:^|/)(?P<digest>[0-9a-f]{64})(?:\.w\d+)?\.\w+$'
+)
+
+
+def is_hashed_name(name):
+    """Назван ли файл по содержимому: такой URL никогда не меняется."""
+    return HASHED_NAME_RE.search(name) is not None
+
+
+@deconstructible
+class HashedFileSystemStorage(FileSystemStorage):
+    """Хранит файлы под именем из SHA-256 их содержимого.
+
+    Одинаковые загрузки получают одно имя и один файл на диске. Файлы
+    не удаляются при смене или удалении изображения поста: на них могут
+    ссылаться другие посты, поэтому файлы без ссылок удаляет команда
+    delete_orphaned_media.
+    """
+
+    def hashed_name(self, name, content):
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        hexdigest = digest.hexdigest()
+        path = PurePosixPath(name)
+        directory = path.parent
+        if is_hashed_name(name):
+            # Новая версия файла с именем из хэша, например оригинал
+            # без EXIF: кладём её в тот же каталог загрузок, а не глубже.
+            directory = directory.parent
+        return str(
+            directory / hexdigest[:2] / f'{hexdigest}{path.suffix.lower()}'
+        )
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.hashed_name(name, content)
+        if self.exists(name):
+            # Свежее время изменения не даёт delete_orphaned_media удалить
+            # файл, пока новая ссылка на него ещё не сохранена.
+            os.utime(self.path(name))
+            return name
+        return super().save(name, content, max_length=max_length)
+
+
+post_image_storage = HashedFileSystemStorage()
@@ -0,0 +1,42 @@
+from django import template
+from django.template import NodeList
+from django.templatetags.cache import CacheNode, do_cache
+
+from blog.metrics import CACHE_REQUESTS
+
+register = template.Library()
+
+# Отметка в render_context: фрагмент отрисован, то есть кэш промахнулся.
+RENDERED = 'blog_cache_rendered'
+
+
+class RenderTrackingNodeList(NodeList):
+    def render(self, context):
+        context.render_context[RENDERED] = True
+        return super().render(context)
+
+
+class CountedCacheNode(CacheNode):
+    """{% cache %}, который считает попадания в blog_cache_requests_total."""
+
+    def __init__(self, nodelist, *args, **kwargs):
+        super().__init__(RenderTrackingNodeList(nodelist), *args, **kwargs)
+
+    def render(self, context):
+        with context.render_context.push():
+            value = super().render(context)
+            rendered = context.render_context.get(RENDERED, False)
+        CACHE_REQUESTS.inc(
+            cache=self.fragment_name, result='miss' if rendered else 'hit'
+        )
+        return value
+
+
+@register.tag('cache')
+def do_counted_cache(parser, token):
+    """Тот же синтаксис, что у {% cache %} из библиотеки cache."""
+    node = do_cache(parser, token)
+    return CountedCacheNode(
+        node.nodelist, node.expire_time_var, node.fragment_name,
+        node.vary_on, node.cache_name,
+    )
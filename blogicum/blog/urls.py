@@ -10,10 +10,14 @@ urlpatterns = [
     path('', views.PostListView.as_view(), name='index'),
 
     path('posts/<int:post_id>/', PostDetailView.as_view(), name='post_detail'),
+    path('posts/<int:post_id>/comments/', views.PostCommentsView.as_view(),
+         name='post_comments'),
 
     path('category/<slug:category_slug>/', views.category_posts,
          name='category_posts'),
 
+    path('search/', views.search, name='search'),
+
     path('posts/create/', PostCreateView.as_view(), name='create_post'),
 
     path('posts/<int:post_id>/delete/', PostDeleteView.as_view(),
@@ -31,6 +35,12 @@ urlpatterns = [
     path('edit_profile/',
          views.ProfileUpdateView.as_view(template_name='blog/create.html'),
          name='edit_profile'),
+    path('profile/change-password/',
+         PasswordChangeView.as_view(
+             template_name='registration/password_change_form.html',
+             success_url=reverse_lazy('blog:index')
+         ),
+         name='change_password'),
     path('profile/<str:username>/', views.ProfileView.as_view(),
          name='profile'),
 
@@ -38,10 +48,4 @@ urlpatterns = [
          name='registration'),
     path('posts/<int:post_id>/edit/', views.PostUpdateView.as_view(),
          name='edit_post'),
-    path('profile/change-password/',
-         PasswordChangeView.as_view(
-             template_name='blog/change_password.html',
-             success_url=reverse_lazy('blog:index')
-         ),
-         name='change_password'),
 ]
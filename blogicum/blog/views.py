@@ -1,7 +1,13 @@
-from django.http import Http404
+import hmac
+from http import HTTPStatus
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.http import Http404, HttpResponse
 from django.shortcuts import get_object_or_404, render
 from django.urls import reverse, reverse_lazy
-from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 from django.views.generic import (
     CreateView,
     DeleteView,
@@ -9,19 +15,33 @@ from django.views.generic import (
     ListView,
     UpdateView,
 )
+from django.views.static import serve
 from django.contrib.auth import get_user_model
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.mixins import LoginRequiredMixin
 
-from blog.constants import PAGINATE_BY
+from blog.cache import anonymous_page_cache, feed_etag, post_detail_etag
+from blog.constants import MEDIA_IMMUTABLE_MAX_AGE, PAGINATE_BY
 from blog.forms import CommentForm, PostForm
+from blog.metrics import CONTENT_TYPE, REGISTRY
 from blog.mixins import AuthorPermissionMixin
 from blog.models import Category, Comment, Post
-from blog.services import get_paginator, get_published_posts
+from blog.services import (
+    get_comments_page,
+    get_paginator,
+    get_published_posts,
+    highlight_snippet,
+    search_posts,
+)
+from blog.storage import is_hashed_name
 
 User = get_user_model()
 
 
+@method_decorator([
+    condition(etag_func=feed_etag('index')),
+    anonymous_page_cache('index'),
+], name='dispatch')
 class PostListView(ListView):
     model = Post
     template_name = 'blog/index.html'
@@ -31,31 +51,39 @@ class PostListView(ListView):
     def get_queryset(self):
         return get_published_posts().order_by('-pub_date')
 
+    def paginate_queryset(self, queryset, page_size):
+        page = get_paginator(queryset, self.request, count_scope='index')
+        return (page.paginator, page, page.object_list,
+                page.has_other_pages())
 
+
+@method_decorator(condition(etag_func=post_detail_etag), name='dispatch')
 class PostDetailView(DetailView):
     model = Post
     template_name = 'blog/detail.html'
     pk_url_kwarg = 'post_id'
 
     def get_object(self, queryset=None):
-        post = get_object_or_404(
-            Post.objects.select_related('author', 'category', 'location'),
+        return get_object_or_404(
+            Post.objects.visible_to(self.request.user).select_related(
+                'author', 'category', 'location'
+            ),
             pk=self.kwargs['post_id']
         )
 
-        if ((not post.is_published or post.pub_date > timezone.now()
-             or not post.category.is_published)
-                and self.request.user != post.author):
-            raise Http404("Пост не найден")
-        return post
-
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm()
-        context['comments'] = self.object.comments.select_related('author')
+        context['comments'] = get_comments_page(self.object, self.request)
         return context
 
 
+class PostCommentsView(PostDetailView):
+    """Следующая порция комментариев поста в виде HTML-фрагмента."""
+
+    template_name = 'includes/comments.html'
+
+
 class PostCreateView(LoginRequiredMixin, CreateView):
     model = Post
     form_class = PostForm
@@ -86,11 +114,8 @@ class PostDeleteView(LoginRequiredMixin, AuthorPermissionMixin, DeleteView):
     pk_url_kwarg = 'pk'
     success_url = reverse_lazy('blog:index')
 
-    def get_object(self, queryset=None):
-        obj = super().get_object(queryset)
-        if obj.author != self.request.user:
-            raise Http404("У вас нет прав для удаления этого поста")
-        return obj
+    def not_author_response(self, obj):
+        raise Http404('У вас нет прав для удаления этого поста')
 
 
 class CommentCreateView(LoginRequiredMixin, CreateView):
@@ -126,9 +151,13 @@ class CommentDeleteView(LoginRequiredMixin, AuthorPermissionMixin, DeleteView):
 
     def get_success_url(self):
         return reverse('blog:post_detail',
-                       kwargs={'post_id': self.object.post.pk})
+                       kwargs={'post_id': self.object.post_id})
 
 
+@method_decorator([
+    condition(etag_func=feed_etag('profile:{username}')),
+    anonymous_page_cache('profile:{username}'),
+], name='dispatch')
 class ProfileView(DetailView):
     model = User
     template_name = 'blog/profile.html'
@@ -139,10 +168,16 @@ class ProfileView(DetailView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         posts = self.object.posts.all()
+        variant = 'all'
         if self.request.user != self.object:
             posts = get_published_posts(posts)
+            variant = 'published'
         posts = posts.order_by('-pub_date')
-        context['page_obj'] = get_paginator(posts, self.request)
+        context['page_obj'] = get_paginator(
+            posts, self.request,
+            count_scope=f'profile:{self.object.username}',
+            count_variant=variant,
+        )
         return context
 
 
@@ -152,6 +187,8 @@ class RegistrationView(CreateView):
     success_url = reverse_lazy('login')
 
 
+@condition(etag_func=feed_etag('category:{category_slug}'))
+@anonymous_page_cache('category:{category_slug}')
 def category_posts(request, category_slug):
     category = get_object_or_404(
         Category,
@@ -162,11 +199,65 @@ def category_posts(request, category_slug):
 
     context = {
         'category': category,
-        'page_obj': get_paginator(posts, request),
+        'page_obj': get_paginator(
+            posts, request, count_scope=f'category:{category_slug}'
+        ),
     }
     return render(request, 'blog/category.html', context)
 
 
+def search(request):
+    query = request.GET.get('q', '').strip()
+    page_obj = Paginator(search_posts(query), PAGINATE_BY).get_page(
+        request.GET.get('page')
+    )
+    for post in page_obj:
+        post.snippet = highlight_snippet(
+            getattr(post, 'raw_snippet', post.text)
+        )
+    context = {
+        'query': query,
+        'page_obj': page_obj,
+    }
+    return render(request, 'blog/search.html', context)
+
+
+def metrics(request):
+    """Метрики Prometheus для персонала или по METRICS_TOKEN.
+
+    Без заголовка Authorization — 401, с неверным токеном — 403.
+    """
+    if not request.user.is_staff:
+        authorization = request.headers.get('Authorization')
+        if authorization is None:
+            response = HttpResponse(status=HTTPStatus.UNAUTHORIZED)
+            response['WWW-Authenticate'] = 'Bearer'
+            return response
+        token = settings.METRICS_TOKEN
+        # Заголовок может быть не ASCII: сравниваются байты, иначе
+        # compare_digest бросает TypeError.
+        if not token or not hmac.compare_digest(
+            authorization.encode('utf-8', 'surrogateescape'),
+            f'Bearer {token}'.encode(),
+        ):
+            return HttpResponse(status=HTTPStatus.FORBIDDEN)
+    return HttpResponse(REGISTRY.render(), content_type=CONTENT_TYPE)
+
+
+def serve_media(request, path, document_root=None):
+    """Раздача MEDIA_ROOT в DEBUG с кэшированием файлов, названных по хэшу.
+
+    В продакшене то же правило задаётся в веб-сервере: для путей вида
+    <64 hex>[.wNNN].ext — Cache-Control: public, max-age=31536000, immutable.
+    """
+    response = serve(request, path, document_root=document_root)
+    if is_hashed_name(path):
+        response['Cache-Control'] = (
+            f'public, max-age={MEDIA_IMMUTABLE_MAX_AGE}, immutable'
+        )
+    return response
+
+
 class ProfileUpdateView(LoginRequiredMixin, UpdateView):
     model = User
     fields = ['first_name', 'last_name', 'username', 'email']
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -21,6 +22,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'blog.middleware.RequestTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -36,7 +38,8 @@ TEMPLATES_DIR = BASE_DIR / 'templates'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # Тот же DjangoTemplates, но с замером времени для Server-Timing.
+        'BACKEND': 'blog.instrumentation.TimedDjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -59,6 +62,149 @@ DATABASES = {
     }
 }
 
+# BLOGICUM_DB_PROFILE=production включает настройки SQLite для нескольких
+# воркеров gunicorn: WAL, постоянные соединения и ожидание блокировок.
+DB_PROFILE = os.getenv('BLOGICUM_DB_PROFILE', 'default')
+
+SQLITE_PRODUCTION_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'temp_store': 'MEMORY',
+    'busy_timeout': 5000,
+}
+
+SQLITE_PRAGMAS = {}
+
+if DB_PROFILE == 'production':
+    SQLITE_PRAGMAS = SQLITE_PRODUCTION_PRAGMAS
+    DATABASES['default'].update({
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'timeout': 5,
+            'transaction_mode': 'IMMEDIATE',
+        },
+    })
+
+# Server-Timing и строки журнала blog.requests по каждому запросу.
+REQUEST_TIMING = True
+
+# /metrics доступен персоналу и по заголовку Authorization: Bearer <токен>.
+METRICS_TOKEN = os.getenv('BLOGICUM_METRICS_TOKEN')
+# Каталог, через который процессы gunicorn складывают метрики; очищайте
+# его перед запуском сервера.
+METRICS_MULTIPROC_DIR = os.getenv('BLOGICUM_METRICS_DIR')
+METRICS_FLUSH_INTERVAL = 1
+
+# Запросы дольше порога пишутся с планом в журнал медленных запросов,
+# разобрать его можно командой slow_queries_report.
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv('BLOGICUM_SLOW_QUERY_MS', 100))
+SLOW_QUERY_LOG = os.getenv(
+    'BLOGICUM_SLOW_QUERY_LOG', str(BASE_DIR / 'slow_queries.log')
+)
+# Параметры запросов попадают в журнал, только если явно включены: среди
+# них ключи сессий и хэши паролей.
+SLOW_QUERY_LOG_PARAMS = os.getenv('BLOGICUM_SLOW_QUERY_PARAMS') == '1'
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'requests': {
+            'format': '%(asctime)s %(levelname)s %(name)s %(message)s',
+        },
+        'slow_queries': {
+            'format': '%(message)s',
+        },
+    },
+    'handlers': {
+        'requests': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'requests',
+        },
+        # В журнал пишут все процессы gunicorn, поэтому ротация внешняя
+        # (logrotate без copytruncate): WatchedFileHandler переоткрывает
+        # файл после переименования.
+        'slow_queries': {
+            'class': 'logging.handlers.WatchedFileHandler',
+            'filename': SLOW_QUERY_LOG,
+            'encoding': 'utf-8',
+            'delay': True,
+            'formatter': 'slow_queries',
+        },
+    },
+    'loggers': {
+        'blog.requests': {
+            'handlers': ['requests'],
+            'level': os.getenv('BLOGICUM_REQUEST_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+        'blog.slow_queries': {
+            'handlers': ['slow_queries'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
+
+# В 'default' лежат страницы, фрагменты карточек и числа постов, в
+# 'versions' — версии областей кэша. Версии вынесены отдельно, чтобы
+# вытеснение страниц их не трогало, и хранятся без срока.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'OPTIONS': {'MAX_ENTRIES': 5000, 'CULL_FREQUENCY': 4},
+    },
+    'versions': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'versions',
+        'TIMEOUT': None,
+        'OPTIONS': {'MAX_ENTRIES': 1_000_000},
+    },
+}
+
+# Несколько процессов gunicorn должны видеть одни и те же версии, иначе
+# сброс в одном процессе не доходит до остальных. В профиле production
+# кэш общий: Redis по BLOGICUM_REDIS_URL (с maxmemory-policy volatile-lru,
+# чтобы вытеснялись только записи со сроком, а не версии) или файлы
+# в BLOGICUM_CACHE_DIR.
+REDIS_URL = os.getenv('BLOGICUM_REDIS_URL')
+CACHE_DIR = Path(os.getenv('BLOGICUM_CACHE_DIR', BASE_DIR / 'cache'))
+
+if DB_PROFILE == 'production' and REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'blogicum',
+        },
+        'versions': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'blogicum-versions',
+            'TIMEOUT': None,
+        },
+    }
+elif DB_PROFILE == 'production':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': CACHE_DIR / 'pages',
+            'OPTIONS': {'MAX_ENTRIES': 20000, 'CULL_FREQUENCY': 4},
+        },
+        # FileBasedCache перечисляет каталог при каждой записи, поэтому
+        # версий немного. Вытесненная версия заводится заново из
+        # time.time_ns() и больше прежней: старые страницы не оживут.
+        'versions': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': CACHE_DIR / 'versions',
+            'TIMEOUT': None,
+            'OPTIONS': {'MAX_ENTRIES': 2000, 'CULL_FREQUENCY': 4},
+        },
+    }
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
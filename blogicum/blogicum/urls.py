@@ -1,8 +1,9 @@
+import re
+
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
 from django.contrib.auth.views import LogoutView
-from django.urls import include, path
+from django.urls import include, path, re_path
 
 from blog import views
 from blog.views import PostCreateView
@@ -17,12 +18,11 @@ class CustomLogoutView(LogoutView):
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', views.metrics, name='metrics'),
     path("auth/logout/", CustomLogoutView.as_view(), name="logout"),
     path('auth/', include('django.contrib.auth.urls')),
     path('auth/registration/', views.RegistrationView.as_view(),
          name='registration'),
-    path('profile/<str:username>/', views.ProfileView.as_view(),
-         name='profile'),
     path('posts/create/', PostCreateView.as_view(), name='create_post'),
     path('posts/<int:post_id>/edit/', views.PostUpdateView.as_view(),
          name='post_edit'),
@@ -35,6 +35,9 @@ urlpatterns = [
     path('posts/<int:pk>/delete_comment/<int:comment_id>/',
          views.CommentDeleteView.as_view(), name='delete_comment'),
     path('', include('blog.urls', namespace='blog')),
+    # После blog.urls, чтобы не перекрывать profile/change-password/.
+    path('profile/<str:username>/', views.ProfileView.as_view(),
+         name='profile'),
     path('pages/', include('pages.urls')),
 ]
 
@@ -43,5 +46,8 @@ handler404 = 'pages.views.page_not_found'
 handler500 = 'pages.views.server_error'
 
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL,
-                          document_root=settings.MEDIA_ROOT)
+    urlpatterns += [
+        re_path(rf'^{re.escape(settings.MEDIA_URL.lstrip("/"))}(?P<path>.*)$',
+                views.serve_media,
+                {'document_root': settings.MEDIA_ROOT}),
+    ]
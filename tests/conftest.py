@@ -92,6 +92,8 @@ pytest_plugins = [
     "fixtures.locations",
     "fixtures.categories",
     "fixtures.comments",
+    "fixtures.cache",
+    "fixtures.media",
     "adapters.comment",
 ]
 
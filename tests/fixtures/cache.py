@@ -0,0 +1,16 @@
+import pytest
+from django.conf import settings
+from django.core.cache import caches
+
+
+def clear_caches() -> None:
+    for alias in settings.CACHES:
+        caches[alias].clear()
+
+
+@pytest.fixture
+def clear_cache():
+    """Пустые кэши страниц и версий областей до и после теста."""
+    clear_caches()
+    yield
+    clear_caches()
@@ -0,0 +1,60 @@
+from io import BytesIO, StringIO
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from PIL import Image
+
+
+def jpeg(
+    width: int = 800,
+    height: int = 400,
+    color: Tuple[int, int, int] = (73, 109, 137),
+    orientation: Optional[int] = None,
+    name: str = "photo.jpg",
+) -> ContentFile:
+    buffer = BytesIO()
+    exif = Image.Exif()
+    if orientation:
+        exif[0x0112] = orientation
+    Image.new("RGB", (width, height), color=color).save(
+        buffer, "JPEG", exif=exif
+    )
+    return ContentFile(buffer.getvalue(), name=name)
+
+
+def process_image_queue() -> None:
+    call_command(
+        "process_image_tasks", once=True, workers=0, stdout=StringIO()
+    )
+
+
+@pytest.fixture
+def media_root(settings, tmp_path: Path, clear_cache) -> Path:
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+@pytest.fixture
+def make_post(user, published_category) -> Callable:
+    """Создаёт пост с изображением и обрабатывает очередь копий."""
+    from blog.models import Post
+
+    def make(image: ContentFile) -> Post:
+        post = Post(
+            title="Пост с фото",
+            text="Текст",
+            pub_date="2020-01-01T00:00Z",
+            author=user,
+            category=published_category,
+            is_published=True,
+        )
+        post.image.save(image.name, image, save=False)
+        post.save()
+        process_image_queue()
+        post.refresh_from_db()
+        return post
+
+    return make
@@ -0,0 +1,103 @@
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _target_fetches(queries, table, column):
+    """Запросы, загружающие целиком строку изменяемого объекта."""
+    pattern = re.compile(
+        rf'^SELECT .*"{table}"\."{column}".* FROM "{table}"'
+    )
+    return [q['sql'] for q in queries if pattern.match(q['sql'])]
+
+
+@pytest.fixture
+def own_comment(mixer, user, post_with_published_location):
+    return mixer.blend(
+        'blog.Comment', post=post_with_published_location, author=user
+    )
+
+
+@pytest.mark.parametrize('method', ('get', 'post'))
+@pytest.mark.parametrize('url_name', ('edit', 'delete'))
+def test_post_views_fetch_post_once(
+        method, url_name, user_client, post_with_published_location
+):
+    post = post_with_published_location
+    data = {
+        'title': post.title, 'text': post.text,
+        'pub_date': post.pub_date.strftime('%Y-%m-%dT%H:%M'),
+        'category': post.category_id, 'is_published': True,
+    }
+    with CaptureQueriesContext(connection) as context:
+        response = getattr(user_client, method)(
+            f'/posts/{post.id}/{url_name}/', data
+        )
+    assert response.status_code in (200, 302)
+    fetches = _target_fetches(context.captured_queries, 'blog_post', 'title')
+    assert len(fetches) == 1, (
+        f'Убедитесь, что `{url_name}` поста загружает публикацию одним'
+        f' запросом. Запросы: {fetches}'
+    )
+    assert 'auth_user' in fetches[0]
+
+
+@pytest.mark.parametrize('method', ('get', 'post'))
+@pytest.mark.parametrize('url_name', ('edit_comment', 'delete_comment'))
+def test_comment_views_fetch_comment_once(
+        method, url_name, user_client, own_comment
+):
+    url = f'/posts/{own_comment.post_id}/{url_name}/{own_comment.id}/'
+    with CaptureQueriesContext(connection) as context:
+        response = getattr(user_client, method)(url, {'text': 'Правка'})
+    assert response.status_code in (200, 302)
+    fetches = _target_fetches(
+        context.captured_queries, 'blog_comment', 'text'
+    )
+    assert len(fetches) == 1, (
+        f'Убедитесь, что `{url_name}` загружает комментарий одним'
+        f' запросом. Запросы: {fetches}'
+    )
+
+
+def test_non_author_redirected_to_comment_post(
+        another_user_client, own_comment
+):
+    url = (
+        f'/posts/{own_comment.post_id}/edit_comment/{own_comment.id}/'
+    )
+    response = another_user_client.get(url)
+    assert response.status_code == 302
+    assert response.url == f'/posts/{own_comment.post_id}/'
+
+
+@pytest.mark.parametrize('method', ('get', 'post'))
+def test_post_delete_by_other_user_is_404(
+        method, another_user_client, post_with_published_location
+):
+    post = post_with_published_location
+    response = getattr(another_user_client, method)(
+        f'/posts/{post.id}/delete/'
+    )
+    assert response.status_code == 404, (
+        'Убедитесь, что чужой пост нельзя удалить: ответ должен быть 404.'
+    )
+    assert type(post).objects.filter(pk=post.pk).exists()
+
+
+@pytest.mark.parametrize('url_name', ('edit_comment', 'delete_comment'))
+def test_comment_views_redirect_other_user_to_post(
+        url_name, another_user_client, own_comment
+):
+    post_id = own_comment.post_id
+    response = another_user_client.post(
+        f'/posts/{post_id}/{url_name}/{own_comment.id}/', {'text': 'x'}
+    )
+    assert response.status_code == 302
+    assert response['Location'] == f'/posts/{post_id}/', (
+        'Убедитесь, что не автора комментария возвращают к его посту.'
+    )
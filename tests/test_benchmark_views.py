@@ -0,0 +1,116 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from blog.models import Comment, Post
+from blog.views import CommentCreateView
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def generated_data():
+    call_command(
+        'generate_data', seed=1, categories=2, locations=2, users=5,
+        posts=30, comments=60, stdout=StringIO()
+    )
+
+
+def test_benchmark_views_writes_baseline(generated_data, tmp_path):
+    baseline = tmp_path / 'baseline.json'
+    call_command(
+        'benchmark_views', baseline=str(baseline), update_baseline=True,
+        iterations=2, stdout=StringIO()
+    )
+    results = json.loads(baseline.read_text(encoding='utf-8'))
+    for name in ('index', 'index[anon]', 'post_detail', 'profile'):
+        assert name in results, (
+            f'Убедитесь, что benchmark_views замеряет маршрут {name}.'
+        )
+        assert results[name]['status'] == 200
+        assert results[name]['queries'] > 0, (
+            'Убедитесь, что benchmark_views считает SQL-запросы.'
+        )
+
+
+def test_benchmark_views_detects_query_regression(generated_data, tmp_path):
+    baseline = tmp_path / 'baseline.json'
+    call_command(
+        'benchmark_views', baseline=str(baseline), update_baseline=True,
+        iterations=2, stdout=StringIO()
+    )
+    results = json.loads(baseline.read_text(encoding='utf-8'))
+    results['post_detail']['queries'] = 0
+    baseline.write_text(json.dumps(results), encoding='utf-8')
+    with pytest.raises(CommandError, match='post_detail: запросов'):
+        call_command(
+            'benchmark_views', baseline=str(baseline), iterations=2,
+            latency_tolerance=100, memory_tolerance=100,
+            stdout=StringIO()
+        )
+
+
+def test_benchmark_views_measures_cold_cache(generated_data, tmp_path):
+    baseline = tmp_path / 'baseline.json'
+    call_command(
+        'benchmark_views', baseline=str(baseline), update_baseline=True,
+        iterations=2, stdout=StringIO()
+    )
+    results = json.loads(baseline.read_text(encoding='utf-8'))
+    anon = results['index[anon]']
+    assert anon['cold_queries'] > anon['queries'], (
+        'Убедитесь, что benchmark_views замеряет и отрисовку без кэша, а '
+        'не только попадание в кэш страниц.'
+    )
+    anon['cold_queries'] = 0
+    baseline.write_text(json.dumps(results), encoding='utf-8')
+    with pytest.raises(CommandError, match='запросов без кэша'):
+        call_command(
+            'benchmark_views', baseline=str(baseline), iterations=2,
+            latency_tolerance=100, memory_tolerance=100,
+            stdout=StringIO()
+        )
+
+
+def test_benchmark_views_posts_forms_and_rolls_back(generated_data, tmp_path):
+    before = (Post.objects.count(), Comment.objects.count())
+    baseline = tmp_path / 'baseline.json'
+    call_command(
+        'benchmark_views', baseline=str(baseline), update_baseline=True,
+        iterations=2, stdout=StringIO()
+    )
+    results = json.loads(baseline.read_text(encoding='utf-8'))
+    for name in ('add_comment[post]', 'edit_comment[post]',
+                 'delete_post[post]'):
+        assert results[name]['status'] == 302, (
+            f'Убедитесь, что benchmark_views отправляет форму {name}.'
+        )
+    assert 'add_comment' not in results
+    assert results['change_password']['status'] == 200, (
+        'Убедитесь, что страница смены пароля не перекрыта профилем.'
+    )
+    assert (Post.objects.count(), Comment.objects.count()) == before, (
+        'Убедитесь, что POST-сценарии benchmark_views не меняют базу.'
+    )
+
+
+def test_benchmark_views_fails_on_error_status(
+    generated_data, tmp_path, monkeypatch
+):
+    def broken(self, form):
+        raise RuntimeError
+
+    monkeypatch.setattr(CommentCreateView, 'form_valid', broken)
+    baseline = tmp_path / 'baseline.json'
+    with pytest.raises(CommandError, match='add_comment'):
+        call_command(
+            'benchmark_views', baseline=str(baseline), update_baseline=True,
+            iterations=1, stdout=StringIO()
+        )
+    assert not baseline.exists(), (
+        'Убедитесь, что базовая линия не записывается, если маршрут '
+        'ответил ошибкой.'
+    )
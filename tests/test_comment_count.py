@@ -0,0 +1,75 @@
+import pytest
+from django.core.management import call_command
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_count_follows_comments(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    assert post.comment_count == 0
+    user_client.post(f'/posts/{post.id}/comment/', {'text': 'Первый'})
+    user_client.post(f'/posts/{post.id}/comment/', {'text': 'Второй'})
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        'Убедитесь, что при добавлении комментария увеличивается'
+        ' `Post.comment_count`.'
+    )
+
+    comment = post.comments.first()
+    user_client.post(f'/posts/{post.id}/delete_comment/{comment.id}/')
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        'Убедитесь, что при удалении комментария уменьшается'
+        ' `Post.comment_count`.'
+    )
+
+
+def test_feed_does_not_aggregate_comments(post_with_published_location):
+    from blog.services import get_published_posts
+
+    query = str(get_published_posts().query).upper()
+    assert 'GROUP BY' not in query and 'COUNT(' not in query
+
+
+def test_rebuild_comment_counts(
+        mixer, post_with_published_location, comment_to_a_post
+):
+    post = post_with_published_location
+    mixer.cycle(2).blend('blog.Comment', post=post)
+    type(post).objects.filter(pk=post.pk).update(comment_count=0)
+    call_command('rebuild_comment_counts', chunk_size=1)
+    post.refresh_from_db()
+    assert post.comment_count == 3
+
+
+def test_post_delete_does_not_touch_each_comment(
+        mixer, post_with_published_location, django_assert_max_num_queries
+):
+    post = post_with_published_location
+    mixer.cycle(300).blend('blog.Comment', post=post)
+    with django_assert_max_num_queries(20, info=(
+        'Убедитесь, что при удалении поста счётчик и кэш не обновляются '
+        'для каждого комментария.'
+    )):
+        post.delete()
+
+
+def test_user_delete_recounts_other_posts(
+        mixer, user, another_user, post_with_published_location,
+        django_assert_max_num_queries
+):
+    post = post_with_published_location
+    other_post = mixer.blend('blog.Post', author=another_user)
+    mixer.cycle(3).blend('blog.Comment', post=post, author=another_user)
+    mixer.cycle(50).blend('blog.Comment', post=other_post, author=user)
+    mixer.blend('blog.Comment', post=post, author=user)
+    type(post).objects.filter(pk=post.pk).update(comment_count=4)
+    with django_assert_max_num_queries(30):
+        another_user.delete()
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        'Убедитесь, что после удаления пользователя счётчики комментариев '
+        'на чужих постах пересчитываются.'
+    )
@@ -0,0 +1,61 @@
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def many_comments(mixer, post_with_published_location):
+    from blog.constants import COMMENTS_PER_PAGE
+
+    return mixer.cycle(COMMENTS_PER_PAGE * 2 + 1).blend(
+        'blog.Comment', post=post_with_published_location
+    )
+
+
+def test_detail_page_shows_first_comments_batch(
+        client, post_with_published_location, many_comments
+):
+    from blog.constants import COMMENTS_PER_PAGE
+
+    post = post_with_published_location
+    response = client.get(f'/posts/{post.id}/')
+    comments = response.context['comments']
+    assert len(comments) == COMMENTS_PER_PAGE, (
+        'Убедитесь, что на странице поста выводится ограниченное число'
+        ' комментариев.'
+    )
+    assert comments.has_next()
+    assert f'/posts/{post.id}/comments/?after=' in response.content.decode()
+
+
+def test_comment_fragments_cover_all_comments(
+        client, post_with_published_location, many_comments
+):
+    post = post_with_published_location
+    comments = client.get(f'/posts/{post.id}/').context['comments']
+    seen = list(comments)
+    while comments.has_next():
+        response = client.get(
+            f'/posts/{post.id}/comments/', {'after': comments.next_cursor}
+        )
+        assert response.status_code == 200
+        assert '<html' not in response.content.decode(), (
+            'Убедитесь, что порция комментариев отдаётся фрагментом без'
+            ' базового шаблона.'
+        )
+        comments = response.context['comments']
+        seen.extend(comments)
+    keys = [(comment.created_at, comment.pk) for comment in seen]
+    assert keys == sorted(keys)
+    assert {comment.pk for comment in seen} == {
+        comment.pk for comment in many_comments
+    }
+
+
+def test_comment_fragment_hidden_post(
+        client, post_with_published_location, many_comments
+):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    assert client.get(f'/posts/{post.id}/comments/').status_code == 404
@@ -0,0 +1,83 @@
+import pytest
+
+pytestmark = [
+    pytest.mark.django_db, pytest.mark.usefixtures('clear_cache')
+]
+
+
+@pytest.fixture
+def conditional_urls(user, published_category, post_with_published_location):
+    return (
+        '/',
+        f'/category/{published_category.slug}/',
+        f'/profile/{user.username}/',
+        f'/posts/{post_with_published_location.id}/',
+    )
+
+
+@pytest.mark.parametrize('client_name', ('client', 'user_client'))
+def test_not_modified_for_matching_etag(
+        client_name, request, conditional_urls
+):
+    client = request.getfixturevalue(client_name)
+    for url in conditional_urls:
+        response = client.get(url)
+        etag = response.headers.get('ETag')
+        assert etag, f'Убедитесь, что страница `{url}` отдаёт ETag.'
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, (
+            f'Убедитесь, что страница `{url}` отвечает 304 при совпадении'
+            ' ETag.'
+        )
+
+
+def test_etag_changes_after_comment(
+        user_client, another_user_client, conditional_urls,
+        post_with_published_location
+):
+    etags = {url: user_client.get(url).headers['ETag']
+             for url in conditional_urls}
+    post = post_with_published_location
+    another_user_client.post(f'/posts/{post.id}/comment/', {'text': 'Да'})
+    for url, etag in etags.items():
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            f'Убедитесь, что ETag страницы `{url}` меняется после нового'
+            ' комментария.'
+        )
+
+
+def test_hidden_post_has_no_etag(
+        client, user_client, post_with_published_location
+):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    assert client.get(f'/posts/{post.id}/').status_code == 404
+    assert 'ETag' in user_client.get(f'/posts/{post.id}/').headers
+
+
+def test_post_etag_follows_csrf_token(
+        user, user_client, post_with_published_location
+):
+    url = f'/posts/{post_with_published_location.id}/'
+    etag = user_client.get(url).headers['ETag']
+    assert user_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+    user_client.logout()
+    user_client.force_login(user)
+    response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200, (
+        'Убедитесь, что после повторного входа страница поста отдаётся '
+        'заново: в форме комментария новый csrf_token.'
+    )
+
+
+def test_comment_portions_have_own_etags(
+        client, post_with_published_location
+):
+    url = f'/posts/{post_with_published_location.id}/comments/'
+    etag = client.get(url).headers['ETag']
+    response = client.get(url, {'after': 'cursor'}, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200, (
+        'Убедитесь, что ETag порции комментариев зависит от курсора ?after=.'
+    )
@@ -0,0 +1,70 @@
+import csv
+import gzip
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_jsonl_export_round_trip(
+        tmp_path, comment_to_a_post, many_posts_with_published_locations
+):
+    from django.contrib.auth import get_user_model
+
+    from blog.models import Category, Comment, Location, Post
+
+    path = tmp_path / 'dump.jsonl'
+    call_command('export_dump', str(path), gzip=True, chunk_size=3)
+    titles = set(Post.objects.values_list('title', flat=True))
+    n_comments = Comment.objects.count()
+
+    for model in (Post, Category, Location, get_user_model()):
+        model.objects.all().delete()
+
+    call_command('load_dump', f'{path}.gz')
+    assert set(Post.objects.values_list('title', flat=True)) == titles, (
+        'Убедитесь, что выгрузка export_dump загружается через load_dump.'
+    )
+    assert Comment.objects.count() == n_comments
+
+
+def test_csv_export_since(tmp_path, mixer, post_with_published_location):
+    from blog.models import Post
+
+    old_post = mixer.blend('blog.Post', category=None)
+    Post.objects.filter(pk=old_post.pk).update(
+        updated_at=timezone.now() - timedelta(days=30)
+    )
+    since = (timezone.now() - timedelta(days=1)).isoformat()
+    call_command(
+        'export_dump', str(tmp_path), format='csv', since=since,
+        models=['blog.category', 'blog.location', 'blog.post']
+    )
+    assert not (tmp_path / 'blog.comment.csv').exists()
+    with open(tmp_path / 'blog.post.csv', encoding='utf-8') as fp:
+        rows = list(csv.DictReader(fp))
+    assert [int(row['id']) for row in rows] == [
+        post_with_published_location.id
+    ], 'Убедитесь, что --since отбирает только изменённые объекты.'
+    assert 'author_id' in rows[0]
+
+
+def test_since_refuses_models_without_modification_date(tmp_path):
+    since = timezone.now().isoformat()
+    with pytest.raises(CommandError, match='auth.user, blog.comment'):
+        call_command('export_dump', str(tmp_path), since=since)
+    with pytest.raises(CommandError, match='blog.comment'):
+        call_command(
+            'export_dump', str(tmp_path), since=since,
+            models=['blog.post', 'blog.comment']
+        )
+
+
+def test_csv_export_gzip(tmp_path, post_with_published_location):
+    call_command('export_dump', str(tmp_path), format='csv', gzip=True)
+    with gzip.open(tmp_path / 'blog.post.csv.gz', 'rt') as fp:
+        assert len(list(csv.reader(fp))) == 2
@@ -0,0 +1,70 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Post
+from blog.paginators import CachedCountPaginator
+
+pytestmark = [
+    pytest.mark.django_db, pytest.mark.usefixtures('clear_cache')
+]
+
+
+def _count_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    return response, [
+        query['sql'] for query in context.captured_queries
+        if 'COUNT(' in query['sql'] and '"blog_post"' in query['sql']
+    ]
+
+
+@pytest.mark.parametrize('url_pattern', (
+    '/',
+    '/category/{category.slug}/',
+    '/profile/{user.username}/',
+))
+def test_feed_count_is_cached(
+        url_pattern, user_client, user, published_category,
+        many_posts_with_published_locations
+):
+    url = url_pattern.format(category=published_category, user=user)
+    _, counts = _count_queries(user_client, url)
+    assert counts
+    response, counts = _count_queries(user_client, url + '?page=2')
+    assert not counts, (
+        'Убедитесь, что число постов в ленте берётся из кэша.'
+    )
+    assert response.context['page_obj'].paginator.count == len(
+        many_posts_with_published_locations
+    )
+
+
+def test_feed_count_invalidated_by_new_post(
+        user_client, user, many_posts_with_published_locations
+):
+    first = user_client.get('/').context['page_obj'].paginator.count
+    post = many_posts_with_published_locations[0]
+    post.pk = None
+    post.save()
+    second = user_client.get('/').context['page_obj'].paginator.count
+    assert second == first + 1, (
+        'Убедитесь, что кэш числа постов сбрасывается при добавлении поста.'
+    )
+    Post.objects.get(pk=post.pk).delete()
+    assert user_client.get('/').context['page_obj'].paginator.count == first
+
+
+def test_large_feed_count_is_estimated(many_posts_with_published_locations):
+    total = len(many_posts_with_published_locations)
+    paginator = CachedCountPaginator(
+        Post.objects.order_by('-pub_date', '-pk'), 3,
+        cache_key='test-feed-count', get_timeout=lambda: 60,
+        count_limit=5, sample_size=total,
+    )
+    assert paginator.count > 5 and paginator.estimated, (
+        'Убедитесь, что для больших лент число постов оценивается.'
+    )
+    last_page = paginator.page(paginator.num_pages)
+    assert not last_page.has_next()
@@ -0,0 +1,80 @@
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import F
+
+pytestmark = [pytest.mark.django_db]
+
+OPTIONS = dict(
+    seed=42, categories=5, locations=5, users=20, posts=200, comments=500,
+    batch_size=64,
+)
+
+
+def _snapshot():
+    from blog.models import Comment, Post
+
+    posts = list(Post.objects.order_by('pk').values_list(
+        'title', 'pub_date', 'is_published', 'author__username',
+        'category__slug'
+    ))
+    comments = list(Comment.objects.order_by('pk').values_list(
+        'text', 'created_at', 'post__title', 'author__username'
+    ))
+    return posts, comments
+
+
+def test_generate_data_is_deterministic(user, published_category):
+    from django.contrib.auth import get_user_model
+
+    from blog.models import Category, Comment, Post
+
+    call_command('generate_data', **OPTIONS)
+    first = _snapshot()
+    assert len(first[0]) == OPTIONS['posts']
+    assert len(first[1]) == OPTIONS['comments']
+
+    with pytest.raises(CommandError, match='--clear'):
+        call_command('generate_data', **OPTIONS)
+    Comment.objects.create(
+        post=Post.objects.first(), author=user, text='Чужой комментарий'
+    )
+    call_command('generate_data', clear=True, **OPTIONS)
+    assert _snapshot() == first, (
+        'Убедитесь, что generate_data с одним seed даёт одинаковые данные.'
+    )
+    assert Post.objects.count() == OPTIONS['posts']
+    assert Comment.objects.count() == OPTIONS['comments']
+    assert Category.objects.filter(pk=published_category.pk).exists(), (
+        'Убедитесь, что --clear удаляет только сгенерированные данные.'
+    )
+    assert get_user_model().objects.filter(pk=user.pk).exists(), (
+        'Убедитесь, что --clear не удаляет пользователей вне прогона.'
+    )
+
+
+def test_generate_data_spreads_comment_dates():
+    from blog.models import Comment
+
+    call_command('generate_data', **OPTIONS)
+    dates = set(Comment.objects.values_list('created_at', flat=True))
+    assert len(dates) > OPTIONS['comments'] * 0.9, (
+        'Убедитесь, что generate_data задаёт комментариям разные даты.'
+    )
+    assert not Comment.objects.filter(
+        created_at__lt=F('post__pub_date')
+    ).exists()
+
+
+def test_generate_data_mixes_hidden_posts():
+    from django.db.models import Sum
+    from django.utils import timezone
+
+    from blog.models import Comment, Post
+
+    call_command('generate_data', **OPTIONS)
+    assert Post.objects.filter(pub_date__gt=timezone.now()).exists()
+    assert Post.objects.filter(is_published=False).exists()
+    assert Post.objects.aggregate(total=Sum('comment_count'))['total'] == (
+        Comment.objects.count()
+    )
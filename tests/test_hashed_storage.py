@@ -0,0 +1,177 @@
+import hashlib
+import os
+import time
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import RequestFactory
+from PIL import Image
+
+from blog.images import rendition_name
+from blog.models import ImageTask, Post
+from blog.storage import HASHED_NAME_RE, is_hashed_name
+from blog.views import serve_media
+from fixtures.media import jpeg
+
+pytestmark = [
+    pytest.mark.django_db, pytest.mark.usefixtures('media_root')
+]
+
+
+def test_identical_uploads_share_file(make_post, media_root):
+    first = make_post(jpeg(name='first.jpg'))
+    second = make_post(jpeg(name='second.jpg'))
+    assert first.image.name == second.image.name, (
+        'Убедитесь, что одинаковые изображения сохраняются в один файл.'
+    )
+    assert is_hashed_name(first.image.name)
+    assert len(list(media_root.rglob('*.jpg'))) == 2  # оригинал и w640
+    assert second.image_meta == first.image_meta
+
+
+def test_shared_file_reuses_processed_meta(make_post, user,
+                                           published_category):
+    first = make_post(jpeg())
+    post = Post(
+        title='Копия', text='Текст', pub_date='2020-01-01T00:00Z',
+        author=user, category=published_category, is_published=True,
+    )
+    image = jpeg()
+    post.image.save(image.name, image, save=False)
+    post.save()
+    post.refresh_from_db()
+    assert post.image_meta == first.image_meta, (
+        'Убедитесь, что уже обработанный файл не обрабатывается повторно.'
+    )
+    assert not ImageTask.objects.exists()
+
+
+def _collect_garbage(**options):
+    call_command('delete_orphaned_media', stdout=StringIO(), **options)
+
+
+def test_unreferenced_file_left_to_gc(make_post, media_root):
+    first = make_post(jpeg())
+    second = make_post(jpeg())
+    name = first.image.name
+    first.delete()
+    second.delete()
+    assert default_storage.exists(name), (
+        'Убедитесь, что файл не удаляется сразу: на него может сослаться '
+        'одновременная загрузка.'
+    )
+    _collect_garbage(min_age=0)
+    assert not default_storage.exists(name), (
+        'Убедитесь, что delete_orphaned_media удаляет файл без ссылок.'
+    )
+    assert not default_storage.exists(rendition_name(name, 640))
+    assert not default_storage.exists(rendition_name(name, 800, '.webp'))
+
+
+def test_reupload_protects_released_file(make_post, media_root):
+    post = make_post(jpeg())
+    name = post.image.name
+    past = time.time() - 2 * 24 * 60 * 60
+    os.utime(media_root / name, (past, past))
+    post.delete()
+    again = make_post(jpeg())
+    _collect_garbage(min_age=1)
+    assert again.image.name == name
+    assert default_storage.exists(name), (
+        'Убедитесь, что файл, на который снова сослалась загрузка, не '
+        'удаляется сборкой мусора.'
+    )
+
+
+def test_replaced_image_kept_until_gc(make_post):
+    post = make_post(jpeg())
+    old_name = post.image.name
+    image = jpeg(color=(200, 10, 10))
+    post.image.save(image.name, image)
+    assert post.image.name != old_name
+    assert default_storage.exists(old_name)
+    _collect_garbage(min_age=0)
+    assert not default_storage.exists(old_name)
+    assert default_storage.exists(post.image.name)
+
+
+def test_hashed_media_cached_forever(make_post):
+    post = make_post(jpeg())
+    request = RequestFactory().get(post.image.url)
+    response = serve_media(
+        request, post.image.name, document_root=default_storage.location
+    )
+    assert 'immutable' in response['Cache-Control'], (
+        'Убедитесь, что файлы с именем из хэша отдаются с долгим кэшем.'
+    )
+    default_storage.save('posts/legacy.jpg', jpeg())
+    response = serve_media(
+        request, 'posts/legacy.jpg', document_root=default_storage.location
+    )
+    assert not response.has_header('Cache-Control')
+
+
+def test_exif_strip_keeps_names_content_addressed(make_post, media_root):
+    buffer = BytesIO()
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    Image.new('RGB', (800, 400), color=(1, 2, 3)).save(
+        buffer, 'JPEG', exif=exif
+    )
+    uploaded = hashlib.sha256(buffer.getvalue()).hexdigest()
+    post = make_post(ContentFile(buffer.getvalue(), name='gps.jpg'))
+    assert uploaded not in post.image.name, (
+        'Убедитесь, что оригинал без EXIF сохраняется под новым именем.'
+    )
+    assert post.image_width == 400
+    for path in media_root.rglob('*'):
+        match = HASHED_NAME_RE.search(path.name)
+        if path.is_file() and match and '.w' not in path.name:
+            assert hashlib.sha256(path.read_bytes()).hexdigest() == (
+                match['digest']
+            ), (
+                'Убедитесь, что содержимое файла с именем из хэша не '
+                'меняется.'
+            )
+
+
+def test_exif_original_deleted_after_strip(make_post, media_root,
+                                           django_capture_on_commit_callbacks):
+    buffer = BytesIO()
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    Image.new('RGB', (800, 400), color=(4, 5, 6)).save(
+        buffer, 'JPEG', exif=exif
+    )
+    uploaded = hashlib.sha256(buffer.getvalue()).hexdigest()
+    with django_capture_on_commit_callbacks(execute=True):
+        post = make_post(ContentFile(buffer.getvalue(), name='gps.jpg'))
+    assert post.image.storage.exists(post.image.name)
+    assert not any(uploaded in path.name for path in media_root.rglob('*')), (
+        'Убедитесь, что оригинал с EXIF удаляется сразу после того, как '
+        'публикация перешла на файл без метаданных.'
+    )
+
+
+def test_exif_original_kept_while_referenced(
+    make_post, user, published_category, media_root,
+    django_capture_on_commit_callbacks,
+):
+    image = jpeg(orientation=6)
+    other = Post(
+        title='Черновик', text='Текст', pub_date='2020-01-01T00:00Z',
+        author=user, category=published_category, is_published=True,
+    )
+    other.image.save(image.name, image, save=False)
+    other.save()
+    ImageTask.objects.filter(post=other).delete()
+    with django_capture_on_commit_callbacks(execute=True):
+        post = make_post(jpeg(orientation=6))
+    assert post.image.name != other.image.name
+    assert other.image.storage.exists(other.image.name), (
+        'Убедитесь, что оригинал не удаляется, пока на него ссылается '
+        'другая публикация.'
+    )
@@ -0,0 +1,174 @@
+from io import StringIO
+
+import pytest
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from PIL import Image
+
+from blog.images import rendition_name
+from blog.models import ImageTask, Post
+from fixtures.media import jpeg, process_image_queue
+
+pytestmark = [
+    pytest.mark.django_db, pytest.mark.usefixtures('media_root')
+]
+
+
+def test_renditions_created_on_upload(client, make_post):
+    post = make_post(jpeg(2000, 1000))
+    assert (post.image_width, post.image_height) == (2000, 1000)
+    for width in (640, 960, 1280):
+        name = rendition_name(post.image.name, width)
+        assert default_storage.exists(name), (
+            'Убедитесь, что при загрузке изображения создаются его '
+            'уменьшенные копии.'
+        )
+        with default_storage.open(name) as fp, Image.open(fp) as image:
+            assert image.size == (width, width // 2)
+
+    content = client.get('/').content.decode()
+    card_url = default_storage.url(rendition_name(post.image.name, 640))
+    assert f'{card_url} 640w' in content, (
+        'Убедитесь, что карточка поста содержит srcset.'
+    )
+    assert 'width="2000" height="1000"' in content
+    content = client.get(f'/posts/{post.id}/').content.decode()
+    detail_url = default_storage.url(rendition_name(post.image.name, 960))
+    assert f'src="{detail_url}"' in content
+
+
+def test_small_image_is_not_upscaled(make_post):
+    post = make_post(jpeg(500, 300))
+    assert post.image_width == 500
+    assert post.image_srcset == f'{post.image.url} 500w'
+    assert not default_storage.exists(rendition_name(post.image.name, 640))
+
+
+def test_exif_orientation_is_applied(make_post):
+    post = make_post(jpeg(1600, 800, orientation=6))
+    assert (post.image_width, post.image_height) == (800, 1600)
+    name = rendition_name(post.image.name, 640)
+    with default_storage.open(name) as fp, Image.open(fp) as image:
+        assert image.size == (640, 1280)
+
+
+def test_backfill_command(make_post):
+    post = make_post(jpeg(1000, 1000))
+    name = rendition_name(post.image.name, 640)
+    default_storage.delete(name)
+    Post.objects.filter(pk=post.pk).update(image_meta={})
+    call_command('create_image_renditions', stdout=StringIO())
+    assert ImageTask.objects.filter(post=post).exists()
+    process_image_queue()
+    post.refresh_from_db()
+    assert post.image_width == 1000
+    assert default_storage.exists(name), (
+        'Убедитесь, что create_image_renditions создаёт копии для '
+        'существующих публикаций.'
+    )
+
+
+def test_placeholder_until_processed(client, user, published_category):
+    post = Post(
+        title='Пост с фото', text='Текст', pub_date='2020-01-01T00:00Z',
+        author=user, category=published_category, is_published=True,
+    )
+    image = jpeg(2000, 1000)
+    post.image.save(image.name, image, save=False)
+    post.save()
+    post.refresh_from_db()
+    assert post.image_pending, (
+        'Убедитесь, что новое изображение ждёт обработки в очереди.'
+    )
+    assert not default_storage.exists(rendition_name(post.image.name, 640))
+    content = client.get('/').content.decode()
+    assert 'data-image-placeholder' in content, (
+        'Убедитесь, что до обработки вместо изображения видна заглушка.'
+    )
+
+    process_image_queue()
+    assert not ImageTask.objects.exists()
+    content = client.get('/').content.decode()
+    assert 'data-image-placeholder' not in content
+    assert 'type="image/webp"' in content, (
+        'Убедитесь, что после обработки страница предлагает WebP-копии.'
+    )
+    post.refresh_from_db()
+    assert default_storage.exists(
+        rendition_name(post.image.name, 2000, '.webp')
+    )
+
+
+def test_exif_is_stripped_from_original(make_post):
+    post = make_post(jpeg(800, 400, orientation=6))
+    with default_storage.open(post.image.name) as fp, Image.open(fp) as image:
+        assert not image.getexif(), (
+            'Убедитесь, что из оригинала удаляются EXIF-данные.'
+        )
+        assert image.size == (400, 800)
+
+
+def test_oversized_image_fails(make_post, monkeypatch):
+    monkeypatch.setattr('blog.images.IMAGE_MAX_PIXELS', 1000)
+    post = make_post(jpeg(100, 100))
+    assert post.image_failed, (
+        'Убедитесь, что слишком большое изображение не обрабатывается.'
+    )
+    task = ImageTask.objects.get(post=post)
+    assert task.status == ImageTask.Status.FAILED
+    assert task.attempts == 1
+
+
+def test_placeholder_has_dimensions(client, user, published_category):
+    post = Post(
+        title='Пост с фото', text='Текст', pub_date='2020-01-01T00:00Z',
+        author=user, category=published_category, is_published=True,
+    )
+    image = jpeg(1200, 600, orientation=6)
+    post.image.save(image.name, image, save=False)
+    post.save()
+    post.refresh_from_db()
+    assert (post.image_width, post.image_height) == (600, 1200), (
+        'Убедитесь, что размеры изображения сохраняются сразу при загрузке.'
+    )
+    content = client.get('/').content.decode()
+    assert 'width="600" height="1200"' in content
+
+
+def test_lqip_and_color_stored(client, make_post, monkeypatch):
+    post = make_post(jpeg(800, 400))
+    color = bytes.fromhex(post.image_color.lstrip('#'))
+    assert all(abs(a - b) <= 4 for a, b in zip(color, (73, 109, 137))), (
+        'Убедитесь, что сохраняется основной цвет изображения.'
+    )
+    assert post.image_lqip.startswith('data:image/jpeg;base64,')
+    assert len(post.image_lqip) < 1000
+
+    def fail(*args, **kwargs):
+        raise AssertionError(
+            'Убедитесь, что шаблоны не открывают файл изображения.'
+        )
+
+    monkeypatch.setattr(default_storage, 'open', fail)
+    monkeypatch.setattr(Image, 'open', fail)
+    cache.clear()
+    for url in ('/', f'/posts/{post.id}/'):
+        content = client.get(url).content.decode()
+        assert post.image_lqip in content, (
+            'Убедитесь, что страница показывает LQIP-превью изображения.'
+        )
+        assert 'width="800" height="400"' in content
+
+
+def test_image_task_admin_queries(admin_client, make_post,
+                                  django_assert_max_num_queries):
+    for _ in range(5):
+        post = make_post(jpeg(100, 100))
+        ImageTask.objects.create(post=post, image=post.image.name)
+    with django_assert_max_num_queries(7, info=(
+        'Убедитесь, что список задач в админке не загружает публикации '
+        'по одной.'
+    )):
+        response = admin_client.get('/admin/blog/imagetask/')
+    assert response.status_code == 200
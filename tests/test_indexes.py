@@ -0,0 +1,44 @@
+import pytest
+from django.db import connection
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _query_plan(queryset):
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return ' '.join(row[-1] for row in cursor.fetchall())
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'sqlite', reason='План запроса снимается для SQLite'
+)
+@pytest.mark.parametrize('variant, index_name', (
+    ('index', 'post_published_feed_idx'),
+    ('category', 'post_category_feed_idx'),
+    ('profile', 'post_author_pub_date_idx'),
+))
+def test_published_posts_use_index(
+        variant, index_name, user, published_category,
+        many_posts_with_published_locations
+):
+    from blog.paginators import CURSOR_ORDERING
+    from blog.services import get_published_posts
+
+    queryset = {
+        'index': None,
+        'category': published_category.posts,
+        'profile': user.posts.all(),
+    }[variant]
+    plan = _query_plan(
+        get_published_posts(queryset).order_by(*CURSOR_ORDERING)[:10]
+    )
+    assert index_name in plan, (
+        f'Убедитесь, что запрос ленты `{variant}` использует индекс'
+        f' `{index_name}`. План запроса: {plan}'
+    )
+    assert 'TEMP B-TREE' not in plan, (
+        f'Убедитесь, что индекс `{index_name}` покрывает сортировку ленты'
+        f' `{variant}`. План запроса: {plan}'
+    )
@@ -0,0 +1,104 @@
+import gzip
+import io
+import json
+from collections import Counter
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+
+pytestmark = [pytest.mark.django_db]
+
+DUMP_PATH = settings.BASE_DIR / 'db.json'
+
+
+def _expected_counts():
+    with open(DUMP_PATH, encoding='utf-8') as fp:
+        records = json.load(fp)
+    return {
+        label: sum(1 for r in records if r['model'] == label)
+        for label in ('blog.category', 'blog.location', 'auth.user',
+                      'blog.post')
+    }, records
+
+
+def _assert_loaded(expected):
+    from django.apps import apps
+
+    for label, count in expected.items():
+        assert apps.get_model(label).objects.count() == count, (
+            f'Убедитесь, что load_dump загружает все объекты `{label}`.'
+        )
+
+
+def test_load_json_array_in_small_chunks(monkeypatch):
+    from blog.management.commands import load_dump
+
+    monkeypatch.setattr(load_dump, 'READ_CHUNK_SIZE', 7)
+    expected, records = _expected_counts()
+    call_command('load_dump', str(DUMP_PATH), batch_size=5)
+    _assert_loaded(expected)
+
+    from blog.models import Post
+
+    post = next(r for r in records if r['model'] == 'blog.post')
+    assert Post.objects.get(pk=post['pk']).title == post['fields']['title']
+
+
+def test_load_gzipped_jsonl(tmp_path):
+    expected, records = _expected_counts()
+    path = tmp_path / 'dump.jsonl.gz'
+    with gzip.open(path, 'wt', encoding='utf-8') as fp:
+        for record in reversed(records):
+            fp.write(json.dumps(record, ensure_ascii=False) + '\n')
+    call_command('load_dump', str(path))
+    _assert_loaded(expected)
+
+
+def test_skipped_records_are_reported():
+    from blog.management.commands.load_dump import MODEL_ORDER
+
+    _, records = _expected_counts()
+    skipped = Counter(
+        r['model'] for r in records if r['model'] not in MODEL_ORDER
+    )
+    assert skipped, 'В db.json должны быть записи других моделей.'
+    out = io.StringIO()
+    call_command('load_dump', str(DUMP_PATH), stdout=out)
+    output = out.getvalue()
+    assert f'{sum(skipped.values())} (' in output and all(
+        f'{label}: {count}' in output for label, count in skipped.items()
+    ), (
+        'Убедитесь, что load_dump сообщает, сколько записей каких моделей '
+        'он пропустил.'
+    )
+
+
+def test_sequences_reset_after_load(monkeypatch):
+    from django.db import connection
+
+    from blog.models import Post
+
+    seen = []
+    original = connection.ops.sequence_reset_sql
+
+    def sequence_reset_sql(style, model_list):
+        seen.extend(model_list)
+        return original(style, model_list)
+
+    monkeypatch.setattr(
+        connection.ops, 'sequence_reset_sql', sequence_reset_sql
+    )
+    call_command('load_dump', str(DUMP_PATH), stdout=io.StringIO())
+    assert Post in seen, (
+        'Убедитесь, что после загрузки load_dump сбрасывает '
+        'последовательности первичных ключей, как loaddata.'
+    )
+    post = Post.objects.first()
+    created = Post.objects.create(
+        title='Новый', text='Текст', pub_date=post.pub_date,
+        author=post.author, category=post.category,
+    )
+    assert created.pk > max(
+        Post.objects.exclude(pk=created.pk).values_list('pk', flat=True)
+    )
@@ -0,0 +1,141 @@
+import json
+import threading
+
+import pytest
+
+from blog.metrics import Counter, Histogram, Registry
+
+pytestmark = [
+    pytest.mark.django_db, pytest.mark.usefixtures('clear_cache')
+]
+
+
+@pytest.fixture
+def metrics_client(client, settings):
+    settings.METRICS_TOKEN = 'secret'
+    client.defaults['HTTP_AUTHORIZATION'] = 'Bearer secret'
+    return client
+
+
+def _sample(client, sample):
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    for line in response.content.decode().splitlines():
+        if line.startswith(sample + ' '):
+            return float(line.rsplit(' ', 1)[1])
+    return 0.0
+
+
+def test_metrics_are_protected(client, user_client, settings):
+    settings.METRICS_TOKEN = 'secret'
+    assert client.get('/metrics').status_code == 401, (
+        'Убедитесь, что /metrics недоступен анонимам.'
+    )
+    assert user_client.get('/metrics').status_code == 401
+    for authorization in ('Bearer wrong', 'Bearer \xe9', 'secret'):
+        response = client.get('/metrics', HTTP_AUTHORIZATION=authorization)
+        assert response.status_code == 403, (
+            'Убедитесь, что /metrics отвечает 403 на неверный токен.'
+        )
+    response = client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret')
+    assert response.status_code == 200
+    assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+
+
+def test_request_and_event_metrics(
+        metrics_client, user_client, post_with_published_location
+):
+    post = post_with_published_location
+    latency = 'blog_request_duration_seconds_count{view="blog:index",' \
+              'method="GET"}'
+    not_found = 'blog_page_not_found_total'
+    comments = 'blog_comments_created_total'
+    hits = 'blog_cache_requests_total{cache="page",result="hit"}'
+    misses = 'blog_cache_requests_total{cache="page",result="miss"}'
+    card_hits = 'blog_cache_requests_total{cache="post_card",result="hit"}'
+    card_misses = (
+        'blog_cache_requests_total{cache="post_card",result="miss"}'
+    )
+    queries = 'blog_db_queries_total{view="blog:index"}'
+    before = {
+        name: _sample(metrics_client, name)
+        for name in (latency, not_found, comments, hits, misses, card_hits,
+                     card_misses, queries)
+    }
+
+    metrics_client.get('/')
+    metrics_client.get('/')
+    user_client.get('/')
+    metrics_client.get('/no-such-page/')
+    user_client.post(f'/posts/{post.id}/comment/', data={'text': 'Текст'})
+
+    after = {name: _sample(metrics_client, name) for name in before}
+    assert after[latency] - before[latency] == 3
+    assert after[misses] - before[misses] == 1
+    assert after[hits] - before[hits] == 1, (
+        'Убедитесь, что считаются попадания и промахи кэша страниц.'
+    )
+    assert after[card_misses] - before[card_misses] == 1
+    assert after[card_hits] - before[card_hits] == 1, (
+        'Убедитесь, что считаются попадания и промахи кэша карточек постов.'
+    )
+    assert after[not_found] - before[not_found] == 1, (
+        'Убедитесь, что считаются ответы page_not_found.'
+    )
+    assert after[comments] - before[comments] == 1, (
+        'Убедитесь, что считаются созданные комментарии.'
+    )
+    assert after[queries] > before[queries]
+
+
+def test_not_found_counted_with_debug(metrics_client, settings):
+    not_found = 'blog_page_not_found_total'
+    before = _sample(metrics_client, not_found)
+    settings.DEBUG = True
+    assert metrics_client.get('/no-such-page/').status_code == 404
+    settings.DEBUG = False
+    assert _sample(metrics_client, not_found) - before == 1, (
+        'Убедитесь, что ответы 404 считаются и при DEBUG = True.'
+    )
+
+
+def test_counter_is_thread_safe():
+    registry = Registry()
+    counter = Counter('test_total', 'Тест.', ('kind',), registry=registry)
+
+    def work():
+        for _ in range(10000):
+            counter.inc(kind='a')
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert 'test_total{kind="a"} 80000.0' in registry.render()
+
+
+def test_multiprocess_directory_is_merged(settings, tmp_path):
+    settings.METRICS_MULTIPROC_DIR = str(tmp_path)
+    registry = Registry()
+    counter = Counter('test_total', 'Тест.', registry=registry)
+    histogram = Histogram(
+        'test_seconds', 'Тест.', buckets=(0.1, 1), registry=registry
+    )
+    counter.inc(2)
+    histogram.observe(0.05)
+    # Файл другого процесса gunicorn.
+    (tmp_path / '1.json').write_text(json.dumps({
+        'test_total': {'[]': 3},
+        'test_seconds': {'[]': [[0, 1, 1], 10.5]},
+    }), encoding='utf-8')
+
+    text = registry.render()
+    assert 'test_total 5.0' in text, (
+        'Убедитесь, что метрики процессов складываются.'
+    )
+    assert 'test_seconds_bucket{le="0.1"} 1' in text
+    assert 'test_seconds_bucket{le="1.0"} 2' in text
+    assert 'test_seconds_bucket{le="+Inf"} 3' in text
+    assert 'test_seconds_count 3' in text
+    assert 'test_seconds_sum 10.55' in text
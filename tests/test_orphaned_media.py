@@ -0,0 +1,103 @@
+import os
+import time
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from PIL import Image
+
+from blog.images import rendition_name
+from blog.models import Post
+from fixtures.media import jpeg
+
+pytestmark = [
+    pytest.mark.django_db, pytest.mark.usefixtures('media_root')
+]
+
+DAY = 24 * 60 * 60
+
+
+def _age(root, days=2):
+    past = time.time() - days * DAY
+    for path in root.rglob('*'):
+        if path.is_file():
+            os.utime(path, (past, past))
+
+
+@pytest.fixture
+def post(make_post):
+    return make_post(jpeg())
+
+
+def _make_orphan(post, media_root):
+    """Файл с копиями, ссылка на который пропала мимо сигналов."""
+    orphan = Post.objects.get(pk=post.pk)
+    image = jpeg(color=(200, 10, 10))
+    orphan.image.save(image.name, image, save=False)
+    name = orphan.image.name
+    (media_root / rendition_name(name, 640)).write_bytes(b'copy')
+    (media_root / rendition_name(name, 800, '.webp')).write_bytes(b'copy')
+    (media_root / 'posts' / 'legacy.jpg').write_bytes(b'legacy')
+    return name
+
+
+def _files(media_root):
+    return {
+        path.relative_to(media_root).as_posix()
+        for path in media_root.rglob('*') if path.is_file()
+    }
+
+
+def test_dry_run_keeps_files(post, media_root):
+    _make_orphan(post, media_root)
+    _age(media_root)
+    before = _files(media_root)
+    out = StringIO()
+    call_command('delete_orphaned_media', dry_run=True, stdout=out)
+    assert _files(media_root) == before, (
+        'Убедитесь, что в режиме --dry-run файлы не удаляются.'
+    )
+    assert 'Будет удалено: 4' in out.getvalue()
+
+
+def test_orphans_deleted(post, media_root):
+    orphan = _make_orphan(post, media_root)
+    _age(media_root)
+    post.refresh_from_db()
+    referenced = {
+        post.image.name,
+        rendition_name(post.image.name, 640),
+        rendition_name(post.image.name, 640, '.webp'),
+        rendition_name(post.image.name, 800, '.webp'),
+    }
+    call_command('delete_orphaned_media', batch_size=2, stdout=StringIO())
+    assert _files(media_root) == referenced, (
+        'Убедитесь, что delete_orphaned_media удаляет файлы без ссылок и их '
+        'копии, но оставляет изображения публикаций.'
+    )
+    assert orphan not in _files(media_root)
+
+
+def test_recent_files_kept(post, media_root):
+    _make_orphan(post, media_root)
+    before = _files(media_root)
+    call_command('delete_orphaned_media', stdout=StringIO())
+    assert _files(media_root) == before, (
+        'Убедитесь, что свежие файлы не удаляются: их публикация может быть '
+        'ещё не сохранена.'
+    )
+
+
+def test_webp_upload_renditions_kept(make_post, media_root):
+    buffer = BytesIO()
+    Image.new('RGB', (1600, 800), color=(10, 200, 10)).save(buffer, 'WEBP')
+    post = make_post(ContentFile(buffer.getvalue(), name='photo.webp'))
+    renditions = _files(media_root) - {post.image.name}
+    assert rendition_name(post.image.name, 640) in renditions
+    _age(media_root)
+    call_command('delete_orphaned_media', stdout=StringIO())
+    assert _files(media_root) == renditions | {post.image.name}, (
+        'Убедитесь, что копии изображения, загруженного в WebP, не '
+        'удаляются как ненужные.'
+    )
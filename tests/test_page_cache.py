@@ -0,0 +1,107 @@
+import pytest
+from django.core.cache import cache
+
+pytestmark = [
+    pytest.mark.django_db, pytest.mark.usefixtures('clear_cache')
+]
+
+
+@pytest.fixture
+def feed_urls(user, published_category):
+    return (
+        '/',
+        f'/category/{published_category.slug}/',
+        f'/profile/{user.username}/',
+    )
+
+
+def test_anonymous_pages_served_from_cache(
+        client, django_assert_max_num_queries, feed_urls,
+        post_with_published_location
+):
+    for url in feed_urls:
+        first = client.get(url)
+        # Остаётся только запрос даты последней публикации для ETag.
+        with django_assert_max_num_queries(1):
+            second = client.get(url)
+        assert second.content == first.content, (
+            f'Убедитесь, что страница `{url}` для анонимов отдаётся из кэша.'
+        )
+
+
+def test_comment_invalidates_cached_pages(
+        client, user_client, feed_urls, post_with_published_location
+):
+    for url in feed_urls:
+        client.get(url)
+    post = post_with_published_location
+    user_client.post(f'/posts/{post.id}/comment/', {'text': 'Новый'})
+    for url in feed_urls:
+        assert 'Комментарии (1)' in client.get(url).content.decode(), (
+            f'Убедитесь, что новый комментарий сбрасывает кэш `{url}`.'
+        )
+
+
+def test_post_category_change_invalidates_old_category(
+        client, post_with_published_location, published_category,
+        another_category
+):
+    url = f'/category/{published_category.slug}/'
+    assert len(client.get(url).context['page_obj']) == 1
+    post = post_with_published_location
+    post.category = another_category
+    post.save()
+    response = client.get(url)
+    assert response.context is not None
+    assert len(response.context['page_obj']) == 0
+
+
+def test_authenticated_pages_not_cached(
+        user_client, post_with_published_location
+):
+    user_client.get('/')
+    assert user_client.get('/').context is not None
+
+
+def _global_version():
+    from blog.cache import GLOBAL_SCOPE, get_scope_versions
+    return get_scope_versions(GLOBAL_SCOPE)[0]
+
+
+def test_versions_survive_page_cache_eviction(
+        client, feed_urls, post_with_published_location
+):
+    from blog.cache import get_scope_versions
+    versions = get_scope_versions('index')
+    client.get(feed_urls[0])
+    cache.clear()
+    assert get_scope_versions('index') == versions, (
+        'Убедитесь, что версии областей хранятся отдельно от страниц и не '
+        'сбрасываются при вытеснении страниц из кэша.'
+    )
+
+
+def test_user_changes_invalidate_only_visible_fields(
+        client, user, feed_urls, post_with_published_location
+):
+    from blog.cache import get_scope_versions
+    version = _global_version()
+    user.set_password('новый-пароль-123')
+    user.save()
+    user.email = 'new@example.com'
+    user.save()
+    assert _global_version() == version, (
+        'Убедитесь, что смена пароля или почты не сбрасывает кэш всех '
+        'страниц.'
+    )
+    profile_version = get_scope_versions(f'profile:{user.username}')
+    user.first_name = 'Новое'
+    user.save()
+    assert _global_version() == version
+    assert get_scope_versions(f'profile:{user.username}') != profile_version
+
+    user.username = 'renamed'
+    user.save()
+    assert _global_version() != version, (
+        'Убедитесь, что смена имени пользователя сбрасывает кэш страниц.'
+    )
@@ -0,0 +1,63 @@
+import pytest
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _walk_cursor_pages(client, url):
+    response = client.get(url)
+    pages = [list(response.context['page_obj'])]
+    while response.context['page_obj'].has_next():
+        cursor = response.context['page_obj'].next_cursor
+        response = client.get(url, {'after': cursor})
+        assert response.status_code == 200
+        pages.append(list(response.context['page_obj']))
+    return pages
+
+
+@pytest.mark.parametrize('url_pattern', (
+    '/',
+    '/category/{category.slug}/',
+    '/profile/{user.username}/',
+))
+def test_cursor_pages_cover_feed(
+        url_pattern, client, user, published_category,
+        many_posts_with_published_locations
+):
+    url = url_pattern.format(category=published_category, user=user)
+    pages = _walk_cursor_pages(client, url)
+    posts = [post for page in pages for post in page]
+    assert all(len(page) <= N_PER_PAGE for page in pages), (
+        'Убедитесь, что на странице курсорной пагинации не больше'
+        f' {N_PER_PAGE} публикаций.'
+    )
+    assert len(posts) == len(many_posts_with_published_locations)
+    assert len({post.pk for post in posts}) == len(posts), (
+        'Убедитесь, что курсорная пагинация не повторяет публикации.'
+    )
+    keys = [(post.pub_date, post.pk) for post in posts]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_cursor_previous_page(client, many_posts_with_published_locations):
+    first_page = client.get('/').context['page_obj']
+    second_page = client.get(
+        '/', {'after': first_page.next_cursor}
+    ).context['page_obj']
+    assert second_page.has_previous()
+    back = client.get(
+        '/', {'before': second_page.previous_cursor}
+    ).context['page_obj']
+    assert list(back) == list(first_page), (
+        'Убедитесь, что ссылка на предыдущую страницу возвращает к тем же'
+        ' публикациям.'
+    )
+
+
+def test_invalid_cursor_falls_back_to_first_page(
+        client, many_posts_with_published_locations
+):
+    response = client.get('/', {'after': 'не-курсор'})
+    assert response.status_code == 200
+    assert len(response.context['page_obj']) == N_PER_PAGE
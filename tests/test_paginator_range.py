@@ -0,0 +1,55 @@
+import re
+from http import HTTPStatus
+
+import pytest
+
+from blog.constants import MAX_OFFSET_PAGE
+from blog.models import Post
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+PAGES = 40
+
+
+@pytest.fixture
+def long_feed(post_with_published_location, clear_cache):
+    post = post_with_published_location
+    posts = []
+    for _ in range(PAGES * N_PER_PAGE - 1):
+        post.pk = None
+        posts.append(Post(**{
+            field.attname: getattr(post, field.attname)
+            for field in Post._meta.concrete_fields if not field.primary_key
+        }))
+    Post.objects.bulk_create(posts)
+
+
+def test_page_range_is_elided(client, long_feed):
+    content = client.get('/', {'page': 10}).content.decode()
+    pages = {int(number) for number in re.findall(r'\?page=(\d+)"', content)}
+    assert pages == {1, 8, 9, 11, 12}, (
+        'Убедитесь, что пагинатор показывает первую и соседние с текущей '
+        'страницы, но не ссылается на дальние.'
+    )
+    assert content.count('<span class="page-link">…</span>') == 2
+    assert 'Последняя' not in content
+    assert re.search(
+        rf'<input type="number" name="page" min="1"\s+'
+        rf'max="{MAX_OFFSET_PAGE}"',
+        content
+    ), 'Убедитесь, что под лентой есть форма перехода на страницу.'
+    assert re.search(r'rel="next" href="\?after=', content), (
+        'Убедитесь, что следующая страница открывается по курсору.'
+    )
+
+
+def test_deep_offset_pages_not_served(client, long_feed):
+    content = client.get('/', {'page': MAX_OFFSET_PAGE}).content.decode()
+    pages = {int(number) for number in re.findall(r'\?page=(\d+)"', content)}
+    assert max(pages) < MAX_OFFSET_PAGE
+    response = client.get('/', {'page': MAX_OFFSET_PAGE + 1})
+    assert response.status_code == HTTPStatus.NOT_FOUND, (
+        'Убедитесь, что страницы дальше MAX_OFFSET_PAGE не открываются '
+        'по номеру.'
+    )
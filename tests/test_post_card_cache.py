@@ -0,0 +1,36 @@
+import pytest
+
+pytestmark = [
+    pytest.mark.django_db, pytest.mark.usefixtures('clear_cache')
+]
+
+
+def test_post_card_follows_author_and_category(
+        user_client, user, published_category, post_with_published_location
+):
+    assert f'@{user.username}' in user_client.get('/').content.decode()
+
+    user.username = 'renamed_author'
+    user.save()
+    published_category.title = 'Переименованная категория'
+    published_category.save()
+
+    content = user_client.get('/').content.decode()
+    assert '@renamed_author' in content, (
+        'Убедитесь, что кэш карточки поста сбрасывается при смене имени'
+        ' автора.'
+    )
+    assert 'Переименованная категория' in content, (
+        'Убедитесь, что кэш карточки поста сбрасывается при изменении'
+        ' категории.'
+    )
+
+
+def test_post_card_follows_post_edit(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    user_client.get('/')
+    post.title = 'Обновлённый заголовок'
+    post.save()
+    assert 'Обновлённый заголовок' in user_client.get('/').content.decode()
@@ -0,0 +1,45 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_visible_to(
+        user, another_user, post_with_published_location,
+        posts_with_unpublished_category, future_posts
+):
+    from django.contrib.auth.models import AnonymousUser
+
+    from blog.models import Post
+
+    hidden = {p.id for p in posts_with_unpublished_category + future_posts}
+    published = post_with_published_location.id
+    for viewer in (AnonymousUser(), another_user):
+        ids = set(Post.objects.visible_to(viewer).values_list('id', flat=True))
+        assert ids == {published}, (
+            'Убедитесь, что чужие скрытые и отложенные посты не видны.'
+        )
+    ids = set(Post.objects.visible_to(user).values_list('id', flat=True))
+    assert ids == hidden | {published}, (
+        'Убедитесь, что автор видит свои скрытые и отложенные посты.'
+    )
+
+
+def test_hidden_post_not_hydrated(
+        another_user_client, posts_with_unpublished_category
+):
+    post = posts_with_unpublished_category[0]
+    with CaptureQueriesContext(connection) as context:
+        response = another_user_client.get(f'/posts/{post.id}/')
+    assert response.status_code == 404
+    post_queries = [
+        q['sql'] for q in context.captured_queries
+        if 'FROM "blog_post"' in q['sql']
+    ]
+    assert post_queries and all(
+        '"blog_post"."is_published"' in sql for sql in post_queries
+    ), (
+        'Убедитесь, что видимость поста проверяется в SQL-запросе, а не'
+        ' после загрузки публикации.'
+    )
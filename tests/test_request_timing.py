@@ -0,0 +1,56 @@
+import logging
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [
+    pytest.mark.django_db, pytest.mark.usefixtures('clear_cache')
+]
+
+
+@pytest.fixture
+def request_log(caplog):
+    logger = logging.getLogger('blog.requests')
+    logger.addHandler(caplog.handler)
+    caplog.handler.setLevel(logging.INFO)
+    yield caplog
+    logger.removeHandler(caplog.handler)
+
+
+def _timings(response):
+    header = response.get('Server-Timing')
+    assert header, 'Убедитесь, что ответ содержит заголовок Server-Timing.'
+    return {
+        metric.split(';')[0]: metric
+        for metric in (part.strip() for part in header.split(','))
+    }
+
+
+def test_server_timing_header(user_client, post_with_published_location):
+    with CaptureQueriesContext(connection) as context:
+        response = user_client.get(
+            f'/posts/{post_with_published_location.id}/'
+        )
+    timings = _timings(response)
+    assert set(timings) == {'sql', 'tpl', 'view', 'total'}
+    queries = int(re.search(r'desc="(\d+) queries"', timings['sql'])[1])
+    assert queries == len(context.captured_queries), (
+        'Убедитесь, что Server-Timing показывает число SQL-запросов.'
+    )
+    template = float(re.search(r'dur=([\d.]+)', timings['tpl'])[1])
+    assert template > 0, (
+        'Убедитесь, что Server-Timing замеряет время отрисовки шаблонов.'
+    )
+
+
+def test_request_log_has_view_name(client, request_log):
+    client.get('/')
+    client.get('/no-such-page/')
+    records = [r for r in request_log.records if r.name == 'blog.requests']
+    assert [r.view_name for r in records] == ['blog:index', 'unresolved'], (
+        'Убедитесь, что строки журнала помечены именем представления.'
+    )
+    assert records[0].status == 200 and records[1].status == 404
+    assert 'view=blog:index' in records[0].getMessage()
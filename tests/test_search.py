@@ -0,0 +1,57 @@
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _found_ids(client, query):
+    response = client.get('/search/', {'q': query})
+    assert response.status_code == 200
+    return [post.id for post in response.context['page_obj']]
+
+
+def test_search_ranks_title_matches_first(
+        mixer, client, user, published_category
+):
+    in_text = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        title='Заметка', text='Рассказ про путешествие на Байкал'
+    )
+    in_title = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        title='Байкал зимой', text='Лёд и ветер'
+    )
+    assert _found_ids(client, 'байкал') == [in_title.id, in_text.id], (
+        'Убедитесь, что поиск находит посты по заголовку и тексту и ставит'
+        ' совпадения в заголовке выше.'
+    )
+    response = client.get('/search/', {'q': 'байкал'})
+    assert '<mark>' in response.content.decode()
+
+
+def test_search_follows_edits_and_visibility(
+        client, user, post_with_published_location,
+        posts_with_unpublished_category
+):
+    post = post_with_published_location
+    post.text = 'уникальноеслово'
+    post.save()
+    assert _found_ids(client, 'уникальное') == [post.id]
+
+    hidden = posts_with_unpublished_category[0]
+    hidden.text = 'уникальноеслово'
+    hidden.save()
+    assert _found_ids(client, 'уникальноеслово') == [post.id], (
+        'Убедитесь, что поиск не показывает скрытые публикации.'
+    )
+
+    user.username = 'ищущий_автор'
+    user.save()
+    assert post.id in _found_ids(client, 'ищущий_автор')
+
+    post.delete()
+    assert _found_ids(client, 'уникальноеслово') == []
+
+
+def test_search_survives_fts_syntax(client, post_with_published_location):
+    for query in ('"', 'AND OR', '*', 'NEAR(', '-'):
+        assert client.get('/search/', {'q': query}).status_code == 200
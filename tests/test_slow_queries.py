@@ -0,0 +1,78 @@
+import json
+import logging
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def slow_query_log(settings, tmp_path, clear_cache):
+    settings.SLOW_QUERY_THRESHOLD_MS = 0
+    path = tmp_path / 'slow_queries.log'
+    logger = logging.getLogger('blog.slow_queries')
+    handlers = logger.handlers
+    handler = logging.FileHandler(path, encoding='utf-8')
+    logger.handlers = [handler]
+    yield path
+    handler.close()
+    logger.handlers = handlers
+
+
+def test_slow_queries_logged_with_plan(
+        client, post_with_published_location, slow_query_log
+):
+    client.get('/')
+    entries = [
+        json.loads(line)
+        for line in slow_query_log.read_text(encoding='utf-8').splitlines()
+    ]
+    feed = [
+        entry for entry in entries
+        if entry['view'] == 'blog:index' and 'blog_post' in entry['sql']
+        and entry['sql'].startswith('SELECT')
+    ]
+    assert feed, (
+        'Убедитесь, что медленные запросы пишутся в журнал с именем '
+        'представления.'
+    )
+    assert all(entry['plan'] for entry in feed), (
+        'Убедитесь, что для медленных запросов сохраняется план выполнения.'
+    )
+    assert not any(
+        entry['sql'].startswith('EXPLAIN') for entry in entries
+    ), 'Убедитесь, что сами EXPLAIN-запросы не попадают в журнал.'
+    assert all(entry['params'] is None for entry in entries), (
+        'Убедитесь, что параметры запросов не пишутся в журнал по умолчанию.'
+    )
+
+
+def test_slow_query_params_logged_when_enabled(
+        client, settings, post_with_published_location, slow_query_log
+):
+    settings.SLOW_QUERY_LOG_PARAMS = True
+    client.get(f'/posts/{post_with_published_location.id}/')
+    entries = [
+        json.loads(line)
+        for line in slow_query_log.read_text(encoding='utf-8').splitlines()
+    ]
+    assert any(entry['params'] for entry in entries)
+
+
+def test_slow_queries_report_groups_shapes(
+        client, post_with_published_location, slow_query_log
+):
+    client.get('/')
+    client.get('/')
+    out = StringIO()
+    call_command(
+        'slow_queries_report', log=str(slow_query_log), top=3,
+        order_by='count', stdout=out
+    )
+    output = out.getvalue()
+    assert output.count('Представления:') == 3
+    assert 'blog:index (2)' in output, (
+        'Убедитесь, что slow_queries_report группирует запросы по форме.'
+    )